@@ -0,0 +1,73 @@
+# src/bench_maxrects.py
+import argparse
+import random
+import time
+from datetime import datetime
+
+from maxrects import Sheet
+from models import Component
+
+
+def _random_components(count, seed):
+    rnd = random.Random(seed)
+    ts = datetime(2025, 1, 1)
+    comps = []
+    for i in range(count):
+        w = rnd.randint(3, 12) * 5
+        h = rnd.randint(3, 12) * 5
+        comps.append(Component(f"B-{i:04d}", w, h, 0.0, ts, float(w * h), 0.0))
+    return comps
+
+
+def fill_sheet(components, max_free_rects):
+    """
+    Plní jeden plech (bez váhového limitu), kým sa dá niečo umiestniť.
+    Vráti zoznam (počet voľných obdĺžnikov, čas find+place v µs) pre každé umiestnenie.
+    """
+    sheet = Sheet(index=1, max_free_rects=max_free_rects)
+    samples = []
+    for comp in components:
+        w, h = comp.dims
+        start = time.perf_counter()
+        pos = sheet.find_position_for(w, h)
+        rotated = False
+        if pos is None:
+            pos = sheet.find_position_for(h, w)
+            w, h, rotated = h, w, True
+        if pos is not None:
+            sheet.place(comp, pos[0], pos[1], w, h, rotated)
+        elapsed = (time.perf_counter() - start) * 1e6
+        if pos is not None:
+            samples.append((sheet.free_rect_count, elapsed))
+    return sheet, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cena jedného umiestnenia MaxRects počas plnenia plechu.")
+    parser.add_argument('--count', type=int, default=400)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--bucket', type=int, default=25, help="počet umiestnení v jednom riadku výpisu")
+    parser.add_argument('--cap', type=int, default=24, help="strop voľných obdĺžnikov")
+    args = parser.parse_args()
+
+    components = _random_components(args.count, args.seed)
+    modes = [
+        ("bez stropu", None),
+        (f"strop {args.cap}", args.cap),
+    ]
+
+    for label, cap in modes:
+        sheet, samples = fill_sheet(components, cap)
+        fill_pct = sheet.used_area / (sheet.width * sheet.height) * 100.0
+        print(f"\n--- {label}: {len(samples)} umiestnení, zaplnenie {fill_pct:.1f} %, "
+              f"max voľných obdĺžnikov {sheet.peak_free_rects} ---")
+        print(f"{'umiestnenia':>12} {'voľné obdĺžniky':>16} {'µs / umiestnenie':>17}")
+        for i in range(0, len(samples), args.bucket):
+            chunk = samples[i:i + args.bucket]
+            avg_f = sum(f for f, _ in chunk) / len(chunk)
+            avg_t = sum(t for _, t in chunk) / len(chunk)
+            print(f"{i + 1:>5}-{i + len(chunk):<6} {avg_f:>16.1f} {avg_t:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+# src/convert_dataset.py
+import argparse
+
+from dataset_handler import convert_csv_to_parquet
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prevod datasetu z CSV do Parquetu (jedna row group na deň).")
+    parser.add_argument('csv_path')
+    parser.add_argument('parquet_path')
+    args = parser.parse_args()
+
+    rows = convert_csv_to_parquet(args.csv_path, args.parquet_path)
+    print(f"Zapísaných {rows} riadkov -> {args.parquet_path}")
+
+
+if __name__ == "__main__":
+    main()
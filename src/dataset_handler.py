@@ -2,33 +2,86 @@ import pandas as pd
 import numpy as np
 from utils import *
 
+CSV_COLUMNS = ['sn', 'dim', 'weight', 'count', 'timestamp']
+
+# stĺpcový (Parquet) formát – rozmery sú už rozdelené na celé čísla
+DIM_COLUMNS = ['dim_1', 'dim_2', 'dim_3']
+PARQUET_COLUMNS = ['sn', *DIM_COLUMNS, 'weight', 'count', 'timestamp']
+
+
 class DatasetHandler:
     def __init__(self, path):
         self.path = path
         self.df = None
 
-    def load(self):
-        self.df = pd.read_csv(self.path, names=['sn', 'dim', 'weight', 'count', 'timestamp'])
+    def load(self, start=None, end=None):
+        """
+        Načíta dataset z CSV alebo z Parquet súboru (podľa prípony).
+        start/end (vrátane/bez) voliteľne obmedzia rozsah timestampov;
+        pri Parquete sa filter posiela do čítačky, takže sa nečítajú
+        row groupy mimo rozsahu.
+        """
+        if str(self.path).endswith('.parquet'):
+            self.df = self._load_parquet(start, end)
+        else:
+            self.df = self._load_csv(start, end)
         return self.df
+
+    def _load_csv(self, start, end):
+        df = pd.read_csv(self.path, names=CSV_COLUMNS)
+        if start is None and end is None:
+            return df
+
+        ts = pd.to_datetime(df['timestamp'], errors='coerce')
+        mask = ts.notna()
+        if start is not None:
+            mask &= ts >= pd.Timestamp(start)
+        if end is not None:
+            mask &= ts < pd.Timestamp(end)
+        return df[mask]
+
+    def _load_parquet(self, start, end):
+        filters = []
+        if start is not None:
+            filters.append(('timestamp', '>=', pd.Timestamp(start)))
+        if end is not None:
+            filters.append(('timestamp', '<', pd.Timestamp(end)))
+
+        return pd.read_parquet(
+            self.path,
+            engine='pyarrow',
+            columns=PARQUET_COLUMNS,
+            filters=filters or None,
+        )
     
     def prepare_data(self):
+        return list(self.iter_blocks())
+
+    def iter_blocks(self):
+        """
+        Generátor half-day blokov v rovnakom formáte ako prepare_data().
+        Bloky sa konvertujú na riadky až pri ich vyžiadaní, takže packing
+        prvého bloku môže začať skôr, ako sa spracuje celý dataset.
+        """
         df = self.df.copy()
 
         df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
-        df = df.dropna(subset=['timestamp']).sort_values('timestamp')
+        df = df.dropna(subset=['timestamp']).sort_values('timestamp', kind='stable')
 
         df = df.loc[df.index.repeat(df['count'])].copy()
         df.drop(columns='count', inplace=True)
         df.reset_index(drop=True, inplace=True)
 
-        df['dim'] = convertTo2D(df['dim'].str.split('x'))
+        if 'dim' in df.columns:
+            df['dim'] = convertTo2D(df['dim'].str.split('x'))
+        else:
+            df['dim'] = _dimColumnsTo2D(df[DIM_COLUMNS])
         df['square'] = calcSquare(df['dim'])
         df['stressSquare'] = calcSquareStress(df['weight'], df['square'])
 
         df['date'] = df['timestamp'].dt.date
         df['time'] = df['timestamp'].dt.time
 
-        parts = []
         cols = ['sn', 'dim', 'weight', 'date', 'time', 'square', 'stressSquare']
 
         for day in sorted(df['date'].unique()):
@@ -48,7 +101,7 @@ class DatasetHandler:
                 ]
                 for _, row in first_half.iterrows()
             ]
-            parts.append(first_half_values)
+            yield first_half_values
 
             # 2. (12:00–23:59:59)
             second_half = day_df[day_df['timestamp'].dt.hour >= 12][cols]
@@ -64,6 +117,50 @@ class DatasetHandler:
                 ]
                 for _, row in second_half.iterrows()
             ]
-            parts.append(second_half_values)
+            yield second_half_values
+
+
+def _dimColumnsTo2D(dim_frame):
+    """Rovnaký výsledok ako convertTo2D, ale z celočíselných stĺpcov bez parsovania textu."""
+    dims = np.sort(dim_frame.to_numpy(dtype=np.int64) + 10, axis=1)[:, :0:-1]
+    return pd.Series(dims.tolist(), index=dim_frame.index)
+
+
+def convert_csv_to_parquet(csv_path, parquet_path):
+    """
+    Jednorazový prevod pôvodného CSV (bez hlavičky) do Parquetu.
+
+    Riadky sú zoradené podľa timestampu a každý deň je v samostatnej
+    row group, takže filter na rozsah dní číta iba potrebné row groupy.
+    Vráti počet zapísaných riadkov.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    df = pd.read_csv(csv_path, names=CSV_COLUMNS)
+    df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
+    df = df.dropna(subset=['timestamp']).sort_values('timestamp', kind='stable')
+
+    dims = df['dim'].str.split('x', expand=True)
+    if dims.shape[1] != len(DIM_COLUMNS) or dims.isna().any().any():
+        raise ValueError(f"{csv_path}: stĺpec dim musí mať tvar AxBxC")
+    for i, col in enumerate(DIM_COLUMNS):
+        df[col] = dims[i].astype(np.int32)
+
+    schema = pa.schema([
+        ('sn', pa.string()),
+        ('dim_1', pa.int32()),
+        ('dim_2', pa.int32()),
+        ('dim_3', pa.int32()),
+        ('weight', pa.float64()),
+        ('count', pa.int32()),
+        ('timestamp', pa.timestamp('s')),
+    ])
+
+    df = df[PARQUET_COLUMNS]
+    with pq.ParquetWriter(parquet_path, schema) as writer:
+        for _, day_df in df.groupby(df['timestamp'].dt.date, sort=True):
+            table = pa.Table.from_pandas(day_df, schema=schema, preserve_index=False)
+            writer.write_table(table)
 
-        return parts
+    return len(df)
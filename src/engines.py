@@ -0,0 +1,28 @@
+# src/engines.py
+from functools import partial
+
+from shelf import Shelf, MultiShelf
+from maxrects import MaxRectsPacker
+from grid_packing import GridPacking
+from guillotine import GuillotinePacker
+
+
+# názov algoritmu -> trieda (továreň) packeru; každá má metódu pack_block(half_day_block),
+# ktorá vráti riadky výstupu pre jeden half-day blok
+ENGINES = {
+    'shelf': Shelf,
+    'multishelf': MultiShelf,
+    'maxrects': MaxRectsPacker,
+    'grid': partial(GridPacking, use_tensor=True),
+    'guillotine': GuillotinePacker,
+}
+
+
+def make_packer(name, metrics=None):
+    """
+    Vytvorí novú inštanciu packeru podľa názvu algoritmu.
+    Viac packerov môže zdieľať jeden SheetMetrics objekt.
+    """
+    if name not in ENGINES:
+        raise ValueError(f"Neznámy algoritmus '{name}', dostupné: {', '.join(ENGINES)}")
+    return ENGINES[name](metrics=metrics)
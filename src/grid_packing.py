@@ -1,5 +1,9 @@
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from metrics import SheetMetrics
 
 GRID_SIZE_CM = 5
 SHEET_SIZE_CM = 500
@@ -28,10 +32,10 @@ class PlacedItem:
 
 
 class Sheet:
-    def __init__(self, sheet_id: int):
+    def __init__(self, sheet_id: int, grid=None):
         self.sheet_id = sheet_id
-        # 2D mriežka: 0 = voľné, 1 = obsadené
-        self.grid = [[0] * GRID_WIDTH for _ in range(GRID_HEIGHT)]
+        # 2D mriežka: 0 = voľné, 1 = obsadené (tenzorový režim dodá vlastnú)
+        self.grid = grid if grid is not None else [[0] * GRID_WIDTH for _ in range(GRID_HEIGHT)]
         self.current_weight = 0.0
         self.used_area_cm2 = 0.0
 
@@ -58,6 +62,10 @@ class Sheet:
             for xx in range(x, x + item.w_cells):
                 self.grid[yy][xx] = 1
 
+        return self.record(item, x, y)
+
+    def record(self, item: Item, x: int, y: int) -> PlacedItem:
+        """Započíta váhu a plochu itemu bez zápisu do mriežky (tú drží volajúci)."""
         self.current_weight += item.weight
         self.used_area_cm2 += item.square
 
@@ -155,6 +163,71 @@ def pack_items_grid(items: List[Item]) -> Tuple[List[PlacedItem], List[Sheet]]:
     return placed, sheets
 
 
+TENSOR_CHUNK = 8   # počiatočná kapacita tenzora obsadenosti (plechov); rastie aspoň o toľko
+
+
+def pack_items_grid_tensor(items: List[Item]) -> Tuple[List[PlacedItem], List[Sheet]]:
+    """
+    Rovnaký first-fit ako pack_items_grid, ale všetky otvorené plechy bloku
+    zdieľajú jeden NumPy tenzor obsadenosti (plechy, 100, 100) a vektor váh.
+    Pre každý item sa z integrálneho obrazu naraz spočíta obsadenosť okna
+    na každej pozícii každého plechu a vyberie sa najmenšie (plech, y, x).
+    Výsledok je zhodný s pack_items_grid.
+    """
+    sheets: List[Sheet] = []
+    placed: List[PlacedItem] = []
+
+    capacity = TENSOR_CHUNK
+    occupancy = np.zeros((capacity, GRID_HEIGHT, GRID_WIDTH), dtype=np.int32)
+    integral = np.zeros((capacity, GRID_HEIGHT + 1, GRID_WIDTH + 1), dtype=np.int32)
+    weights = np.zeros(capacity, dtype=np.float64)
+
+    for item in items:
+        w, h = item.w_cells, item.h_cells
+        if w > GRID_WIDTH or h > GRID_HEIGHT or item.weight > MAX_WEIGHT:
+            raise RuntimeError(
+                "Item sa nezmestí ani na prázdny plech – pravdepodobne chyba v dimenziách."
+            )
+
+        n = len(sheets)
+        hit = None
+        if n:
+            # súčet obsadených buniek v okne h x w pre každú pozíciu (plech, y, x)
+            I = integral[:n]
+            window = I[:, h:, w:] - I[:, :-h, w:] - I[:, h:, :-w] + I[:, :-h, :-w]
+            fits = window == 0
+            fits &= (weights[:n] + item.weight <= MAX_WEIGHT)[:, None, None]
+
+            flat = int(fits.argmax())   # prvé True v poradí (plech, y, x)
+            if fits.flat[flat]:
+                hit = np.unravel_index(flat, fits.shape)
+
+        if hit is None:
+            # nový plech – v prípade potreby tenzor geometricky zväčši,
+            # aby kopírovanie pri raste bolo amortizovane O(1) na plech
+            if n == capacity:
+                extra = max(capacity, TENSOR_CHUNK)
+                capacity += extra
+                occupancy = np.concatenate([occupancy, np.zeros((extra, GRID_HEIGHT, GRID_WIDTH), dtype=np.int32)])
+                integral = np.concatenate([integral, np.zeros((extra, GRID_HEIGHT + 1, GRID_WIDTH + 1), dtype=np.int32)])
+                weights = np.concatenate([weights, np.zeros(extra)])
+            sheets.append(Sheet(sheet_id=n + 1, grid=occupancy[n]))
+            hit = (n, 0, 0)
+
+        s_idx, y, x = (int(v) for v in hit)
+        occupancy[s_idx, y:y + h, x:x + w] = 1
+        integral[s_idx, 1:, 1:] = occupancy[s_idx].cumsum(axis=0).cumsum(axis=1)
+        weights[s_idx] += item.weight
+        placed.append(sheets[s_idx].record(item, x, y))
+
+    # mriežky plechov sú pohľady do tenzora (0 = voľné, 1 = obsadené);
+    # po zväčšení tenzora ukazujú staršie pohľady do pôvodného poľa
+    for s_idx, sheet in enumerate(sheets):
+        sheet.grid = occupancy[s_idx]
+
+    return placed, sheets
+
+
 def sort_items_by_area_desc(items: List[Item]) -> List[Item]:
     """Heuristika: zoradenie podľa plochy (square) zostupne."""
     return sorted(items, key=lambda it: it.square, reverse=True)
@@ -171,9 +244,13 @@ class GridPacking:
     Pracuje s OPTIMALIZOVANÝM riešením (zoradenie podľa plochy).
     """
 
-    def __init__(self):
-        # všetky plechy zo všetkých half-day blokov (iba optimalizované riešenie)
-        self.sheets_all: List[Sheet] = []
+    def __init__(self, metrics: Optional[SheetMetrics] = None, use_tensor: bool = False):
+        # True -> všetky plechy bloku naraz v NumPy tenzore (pack_items_grid_tensor)
+        self.use_tensor = use_tensor
+        # priebežné štatistiky plechov zo všetkých half-day blokov
+        self.metrics = metrics if metrics is not None else SheetMetrics(
+            MAX_WEIGHT, SHEET_SIZE_CM * SHEET_SIZE_CM
+        )
 
     def run(self, prepared_data) -> None:
         """
@@ -181,7 +258,7 @@ class GridPacking:
         Pre každý blok:
           - vygeneruje Item-y,
           - spraví optimalizovaný packing,
-          - uloží plechy do self.sheets_all,
+          - započíta plechy do self.metrics,
           - zapíše optimalizované rozloženie do data/output.csv.
         """
         import csv
@@ -191,46 +268,43 @@ class GridPacking:
             writer_opt = csv.writer(f_opt)
 
             for half_day_block in prepared_data:
-                # 1) Item-y pre jeden half-day
-                items = generate_items_for_half_day(half_day_block)
+                writer_opt.writerows(self.pack_block(half_day_block))
 
-                # 2) OPTIMALIZOVANÉ poradie – podľa plochy zostupne
-                items_sorted = sort_items_by_area_desc(items)
+    def pack_block(self, half_day_block) -> List[list]:
+        """
+        Zabalí jeden half-day blok a vráti riadky výstupu
+        [sheet_id, sn, timestamp, x_cm, y_cm].
+        """
+        # 1) Item-y pre jeden half-day
+        items = generate_items_for_half_day(half_day_block)
 
-                # 3) packing na mriežke
-                placed_opt, sheets_opt = pack_items_grid(items_sorted)
+        # 2) OPTIMALIZOVANÉ poradie – podľa plochy zostupne
+        items_sorted = sort_items_by_area_desc(items)
 
-                # 4) pripoj plechy do globálneho zoznamu
-                self.sheets_all.extend(sheets_opt)
+        # 3) packing na mriežke
+        if self.use_tensor:
+            placed_opt, sheets_opt = pack_items_grid_tensor(items_sorted)
+        else:
+            placed_opt, sheets_opt = pack_items_grid(items_sorted)
 
-                # 5) zapíš výsledok do CSV
-                for p in placed_opt:
-                    writer_opt.writerow([p.sheet_id, p.sn, p.timestamp, p.x_cm, p.y_cm])
+        # 4) započítaj plechy do štatistík
+        for sheet in sheets_opt:
+            self.metrics.add_sheet(sheet.current_weight, sheet.used_area_cm2)
+        self.metrics.end_block(len(sheets_opt))
+
+        # 5) riadky výsledku
+        return [[p.sheet_id, p.sn, p.timestamp, p.x_cm, p.y_cm] for p in placed_opt]
 
     def get_sheet_avg_weight(self):
         """
         Vráti dvojicu:
           (priemerná váha na plech v kg, priemerné zaťaženie v % z MAX_WEIGHT).
         """
-        if not self.sheets_all:
-            return 0.0, 0.0
-
-        total_weight = sum(s.current_weight for s in self.sheets_all)
-        sheet_count = len(self.sheets_all)
-        avg_w = total_weight / sheet_count
-        avg_w_pct = (avg_w / MAX_WEIGHT) * 100.0
-        return avg_w, avg_w_pct
+        return self.metrics.get_sheet_avg_weight()
 
     def get_sheet_avg_area(self):
         """
         Vráti dvojicu:
           (priemerná zabratá plocha v cm^2, priemerné využitie plochy v %).
         """
-        if not self.sheets_all:
-            return 0.0, 0.0
-
-        total_area_used = sum(s.used_area_cm2 for s in self.sheets_all)
-        sheet_count = len(self.sheets_all)
-        avg_a = total_area_used / sheet_count
-        avg_a_pct = avg_a / (SHEET_SIZE_CM * SHEET_SIZE_CM) * 100.0
-        return avg_a, avg_a_pct
\ No newline at end of file
+        return self.metrics.get_sheet_avg_area()
@@ -0,0 +1,328 @@
+# src/guillotine.py
+from __future__ import annotations
+import heapq
+from bisect import bisect_left, insort
+from itertools import accumulate
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from models import Component
+from metrics import SheetMetrics
+from maxrects import (
+    PLATE_SIZE_CM,
+    MAX_WEIGHT,
+    Rect,
+    Placement,
+    batch_to_components,
+    sheets_to_output_rows,
+)
+
+
+# ---------- Sheet / index voľných obdĺžnikov ----------
+
+@dataclass
+class GuillotineSheet:
+    index: int
+    width: int = PLATE_SIZE_CM
+    height: int = PLATE_SIZE_CM
+    max_weight: float = MAX_WEIGHT
+    placements: List[Placement] = field(default_factory=list)
+    current_weight: float = 0.0
+    used_area: float = 0.0
+    free_ids: Set[int] = field(default_factory=set)   # id voľných obdĺžnikov v indexe
+
+
+def _first_at_least(tree: list, size: int, lo: int, value) -> Optional[int]:
+    """Prvý list >= lo v segmentovom strome s maximom, ktorého hodnota je >= value."""
+    if lo >= size:
+        return None
+
+    # hore: najbližší podstrom vpravo od lo s maximom >= value
+    node = size + lo
+    while tree[node] < value:
+        while node & 1:
+            node >>= 1
+        if node == 0:
+            return None
+        node += 1
+
+    # dole: najľavejší list s hodnotou >= value
+    while node < size:
+        node *= 2
+        if tree[node] < value:
+            node += 1
+    return node - size
+
+
+def _set_leaf(tree: list, size: int, pos: int, value):
+    node = size + pos
+    if tree[node] == value:
+        return
+    tree[node] = value
+    node //= 2
+    while node:
+        left, right = tree[2 * node], tree[2 * node + 1]
+        best = left if left > right else right
+        if tree[node] == best:
+            break
+        tree[node] = best
+        node //= 2
+
+
+class _SideIndex:
+    """
+    Voľné obdĺžniky podľa jednej strany. Pre každú celočíselnú dĺžku strany
+    (0..PLATE_SIZE_CM) je riadok: zoradený zoznam (druhá strana, id) a strom
+    nad druhou stranou s maximom váhovej rezervy plechu; bunka (dĺžka,
+    druhá strana) drží haldu (-rezerva, id). Nad riadkami je segmentový
+    strom s maximom druhej strany.
+
+    Hľadanie preskočí riadky s krátkou druhou stranou v O(log PLATE_SIZE_CM)
+    a v riadku nájde bunku s dostatočnou rezervou tiež v O(log PLATE_SIZE_CM),
+    takže obdĺžniky plechov, ktoré komponent neunesú, sa neprechádzajú.
+    Rezerva plechu len klesá, preto sa pri umiestnení neprepisujú všetky
+    jeho obdĺžniky a odobratý obdĺžnik sa z haldy hneď nevyberá: hodnoty
+    v strome rezerv sú horné odhady a bunka sa opraví, až keď ju hľadanie
+    nájde. Každá oprava zodpovedá jednému poklesu rezervy alebo odobratiu.
+    """
+
+    def __init__(self, reserve_of, max_side: int = PLATE_SIZE_CM):
+        self._size = 1
+        while self._size <= max_side:
+            self._size *= 2
+        self._tree = [-1] * (2 * self._size)
+        self.buckets: List[List[Tuple[int, int]]] = [[] for _ in range(self._size)]
+        self._rows: Dict[int, List[float]] = {}                 # dĺžka -> strom rezerv
+        self._cells: Dict[int, List[Tuple[float, int]]] = {}    # bunka -> halda (-rezerva, id)
+        self._reserve_of = reserve_of     # id -> aktuálna rezerva alebo None
+
+    def add(self, first: int, second: int, reserve: float, rid: int):
+        insort(self.buckets[first], (second, rid))
+        self._update_row(first)
+        heapq.heappush(self._cells.setdefault(first * self._size + second, []), (-reserve, rid))
+
+        row = self._rows.get(first)
+        if row is None:
+            row = self._rows[first] = [-1.0] * (2 * self._size)
+        if row[self._size + second] < reserve:
+            _set_leaf(row, self._size, second, reserve)
+
+    def remove(self, first: int, second: int, rid: int):
+        # z haldy bunky sa obdĺžnik vyberie až pri oprave v _find_in_row
+        bucket = self.buckets[first]
+        del bucket[bisect_left(bucket, (second, rid))]
+        self._update_row(first)
+
+    def find(self, first: int, second: int, weight: float, limit: Optional[int] = None):
+        """
+        Najmenšia dĺžka pos >= first (pos - first < limit) a v nej najmenšia
+        druhá strana >= second s obdĺžnikom na plechu s rezervou >= weight.
+        Vráti (pos, id) – z bunky obdĺžnik s najväčšou rezervou – alebo None.
+        """
+        pos = _first_at_least(self._tree, self._size, first, second)
+        while pos is not None:
+            if limit is not None and pos - first >= limit:
+                return None
+            rid = self._find_in_row(pos, second, weight)
+            if rid is not None:
+                return pos, rid
+            pos = _first_at_least(self._tree, self._size, pos + 1, second)
+        return None
+
+    def _find_in_row(self, pos: int, second: int, weight: float) -> Optional[int]:
+        row = self._rows[pos]
+        lo = second
+        while True:
+            sec = _first_at_least(row, self._size, lo, weight)
+            if sec is None:
+                return None
+            heap = self._fix_cell(pos, sec)
+            if heap and -heap[0][0] >= weight:
+                return heap[0][1]
+            lo = sec      # odhad rezervy bol privysoký, bunka sa už preskočí
+
+    def _update_row(self, pos: int):
+        bucket = self.buckets[pos]
+        _set_leaf(self._tree, self._size, pos, bucket[-1][0] if bucket else -1)
+
+    def _fix_cell(self, first: int, second: int):
+        """Zahodí zastarané záznamy z vrchu haldy a nastaví presnú rezervu bunky."""
+        cell = first * self._size + second
+        heap = self._cells.get(cell)
+        while heap:
+            reserve = self._reserve_of(heap[0][1])
+            if reserve == -heap[0][0]:
+                break
+            if reserve is None:
+                heapq.heappop(heap)                                  # obdĺžnik je preč
+            else:
+                heapq.heapreplace(heap, (-reserve, heap[0][1]))      # rezerva klesla
+
+        row = self._rows[first]
+        if heap:
+            _set_leaf(row, self._size, second, -heap[0][0])
+        else:
+            self._cells.pop(cell, None)
+            _set_leaf(row, self._size, second, -1.0)
+        return heap
+
+
+class FreeRectIndex:
+    """
+    Voľné obdĺžniky všetkých otvorených plechov bloku, indexované podľa
+    šírky aj podľa výšky spolu s váhovou rezervou plechu. Pridanie aj
+    odobratie je O(log PLATE_SIZE_CM); hľadanie nezávisí od počtu
+    otvorených plechov, iba od počtu preskočených riadkov a opráv rezervy.
+    """
+
+    def __init__(self):
+        self._rects: Dict[int, Tuple[Rect, GuillotineSheet]] = {}
+        self._by_w = _SideIndex(self._reserve)   # šírka -> (výška, id)
+        self._by_h = _SideIndex(self._reserve)   # výška -> (šírka, id)
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._rects)
+
+    def add(self, rect: Rect, sheet: GuillotineSheet):
+        rid = self._next_id
+        self._next_id += 1
+        self._rects[rid] = (rect, sheet)
+        sheet.free_ids.add(rid)
+        self._push(rid)
+
+    def remove(self, rid: int) -> Tuple[Rect, GuillotineSheet]:
+        rect, sheet = self._rects.pop(rid)
+        sheet.free_ids.discard(rid)
+        self._by_w.remove(rect.w, rect.h, rid)
+        self._by_h.remove(rect.h, rect.w, rid)
+        return rect, sheet
+
+    def drop_sheet(self, sheet: GuillotineSheet):
+        """Uzavretý plech – jeho voľné obdĺžniky sa už neponúkajú."""
+        for rid in list(sheet.free_ids):
+            self.remove(rid)
+
+    def find(self, w: int, h: int, weight: float) -> Optional[Tuple[int, int]]:
+        """
+        Best Short Side Fit: vráti (id obdĺžnika, kratší zvyšok) alebo None.
+        min(dw, dh) je minimum z najmenšieho dw a najmenšieho dh, preto
+        stačí v každom indexe nájsť najkratšiu stranu, kam sa w x h zmestí
+        na plech, ktorý unesie ďalšiu váhu.
+        """
+        best: Optional[Tuple[int, int]] = None
+
+        for index, first, second in ((self._by_w, w, h), (self._by_h, h, w)):
+            hit = index.find(first, second, weight, None if best is None else best[1])
+            if hit is not None:
+                best = (hit[1], hit[0] - first)
+
+        return best
+
+    def _push(self, rid: int):
+        rect, sheet = self._rects[rid]
+        reserve = sheet.max_weight - sheet.current_weight
+        self._by_w.add(rect.w, rect.h, reserve, rid)
+        self._by_h.add(rect.h, rect.w, reserve, rid)
+
+    def _reserve(self, rid: int) -> Optional[float]:
+        entry = self._rects.get(rid)
+        if entry is None:
+            return None
+        sheet = entry[1]
+        return sheet.max_weight - sheet.current_weight
+
+
+# ---------- GuillotinePacker ----------
+
+class GuillotinePacker:
+    """
+    Rýchly guillotine packing: komponenty zoradené podľa plochy zostupne,
+    každý ide (aj otočený) do voľného obdĺžnika s najmenším kratším zvyškom
+    spomedzi všetkých otvorených plechov s váhovou rezervou; nový plech sa
+    otvorí, až keď sa nikam nezmestí. Zvyšok sa delí podľa kratšej osi.
+    """
+
+    def __init__(self, metrics: Optional[SheetMetrics] = None):
+        self.metrics = metrics if metrics is not None else SheetMetrics(MAX_WEIGHT, PLATE_SIZE_CM * PLATE_SIZE_CM)
+
+    def pack_block(self, batch_rows: list[list]) -> List[list]:
+        """Zabalí jeden half-day blok (výstup DatasetHandleru) a vráti riadky výstupu."""
+        return sheets_to_output_rows(self.pack_batch(batch_to_components(batch_rows)))
+
+    def pack_batch(self, components: List[Component]) -> List[GuillotineSheet]:
+        sheets: List[GuillotineSheet] = []
+        free = FreeRectIndex()
+
+        ordered = sorted(components, key=lambda c: (c.width * c.height, max(c.dims)), reverse=True)
+        # najľahší ešte nezabalený komponent po umiestnení ordered[i]; za
+        # posledným už nič nezostáva, takže sa nič nezatvára
+        suffix_min = list(accumulate((c.weight for c in reversed(ordered)), min))[::-1]
+        remaining_min = suffix_min[1:] + [0.0]
+        # (váhová rezerva, poradie plechu) – rezerva len klesá, takže staré
+        # záznamy ju iba nadhodnocujú a vyberú sa neskôr
+        reserves: List[Tuple[float, int]] = []
+
+        for i, comp in enumerate(ordered):
+            best = self._find_best(free, comp)
+            if best is None:
+                sheet = GuillotineSheet(index=len(sheets) + 1)
+                sheets.append(sheet)
+                free.add(Rect(0, 0, sheet.width, sheet.height), sheet)
+                best = self._find_best(free, comp)
+                if best is None:
+                    raise RuntimeError(
+                        f"Komponent {comp.sn} sa nezmestí ani na prázdny plech – pravdepodobne chyba v dimenziách."
+                    )
+
+            rid, w, h, rotated = best
+            sheet = self._place(free, comp, rid, w, h, rotated)
+
+            heapq.heappush(reserves, (sheet.max_weight - sheet.current_weight, sheet.index))
+
+            # plechy, ktoré neunesú ani najľahší zostávajúci komponent, sa zatvoria
+            while reserves and reserves[0][0] < remaining_min[i]:
+                free.drop_sheet(sheets[heapq.heappop(reserves)[1] - 1])
+
+        for sheet in sheets:
+            self.metrics.add_sheet(sheet.current_weight, sheet.used_area)
+        self.metrics.end_block(len(sheets))
+        return sheets
+
+    @staticmethod
+    def _find_best(free: FreeRectIndex, comp: Component):
+        w, h = comp.dims
+        best = None   # (kratší zvyšok, id obdĺžnika, w, h, rotated)
+
+        for rotated, (cw, ch) in [(False, (w, h)), (True, (h, w))]:
+            fit = free.find(cw, ch, comp.weight)
+            if fit is not None and (best is None or fit[1] < best[0]):
+                best = (fit[1], fit[0], cw, ch, rotated)
+
+        return None if best is None else best[1:]
+
+    @staticmethod
+    def _place(free: FreeRectIndex, comp: Component, rid: int, w: int, h: int, rotated: bool):
+        fr, sheet = free.remove(rid)
+        x, y = fr.x, fr.y
+        dw = fr.w - w
+        dh = fr.h - h
+
+        # split podľa kratšej zvyškovej osi
+        if dw <= dh:
+            right = Rect(x + w, y, dw, h)
+            bottom = Rect(x, y + h, fr.w, dh)
+        else:
+            right = Rect(x + w, y, dw, fr.h)
+            bottom = Rect(x, y + h, w, dh)
+
+        new_weight = sheet.current_weight + comp.weight
+        sheet.placements.append(Placement(comp, x, y, w, h, rotated, new_weight))
+        sheet.current_weight = new_weight
+        sheet.used_area += comp.square
+
+        # nové zvyšky sa zaradia už s novou rezervou plechu
+        for r in (right, bottom):
+            if r.w > 0 and r.h > 0:
+                free.add(r, sheet)
+        return sheet
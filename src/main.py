@@ -1,9 +1,10 @@
 from dataset_handler import DatasetHandler
 from shelf import *
-from maxrects import MaxRectsPacker, batch_to_components, sheets_to_output_rows, compute_stats
+from maxrects import MaxRectsPacker, batch_to_components, sheets_to_output_rows
 import csv
 import time
 from grid_packing import GridPacking
+from guillotine import GuillotinePacker
 
 
 def timer(label, func, *args, **kwargs):
@@ -32,21 +33,33 @@ def main():
 
     print(f"Priemerná váha na plech: {avg_w:.2f} kg ({avg_w_pct:.2f} %)")
     print(f"Priemerná zabrata plocha: {avg_a:.2f} mm² ({avg_a_pct:.2f} %)")
+    print(shelf.metrics.report())
+
+    # MULTI-SHELF
+    multishelf = MultiShelf()
+
+    print("\n--- Štatistika plechov MULTI-SHELF ---")
+    timer("MULTI-SHELF", multishelf.run_shelf, prepared_data)
+
+    avg_w, avg_w_pct = multishelf.get_sheet_avg_weight()
+    avg_a, avg_a_pct = multishelf.get_sheet_avg_area()
+
+    print(f"Priemerná váha na plech: {avg_w:.2f} kg ({avg_w_pct:.2f} %)")
+    print(f"Priemerná zabrata plocha: {avg_a:.2f} cm² ({avg_a_pct:.2f} %)")
+    print(multishelf.metrics.report())
 
     # MAXRECTS
     packer = MaxRectsPacker()
     all_rows = []
-    all_sheets = []
 
 
     def run_maxrects(prepared_data):
-        nonlocal all_rows, all_sheets
+        nonlocal all_rows
         for batch_rows in prepared_data:
             if not batch_rows:
                 continue
             components = batch_to_components(batch_rows)
             sheets = packer.pack_batch(components)
-            all_sheets.extend(sheets)
             rows = sheets_to_output_rows(sheets)
             all_rows.extend(rows)
 
@@ -58,13 +71,39 @@ def main():
         writer = csv.writer(f)
         writer.writerows(all_rows)
 
-    avg_area, avg_area_pct, avg_w, avg_w_pct = compute_stats(all_sheets)
+    avg_w, avg_w_pct = packer.metrics.get_sheet_avg_weight()
+    avg_area, avg_area_pct = packer.metrics.get_sheet_avg_area()
     
     print(f"Priemerné zaťaženie plechu:        {avg_w:.2f} kg ({avg_w_pct:.2f} %)")
     print(f"Priemerné využitie plochy na plech: {avg_area:.2f} cm^2 ({avg_area_pct:.2f} %)")
+    print(packer.metrics.report())
+    print(f"Max. voľných obdĺžnikov na plechu: {packer.peak_free_rects}")
+
+    # GUILLOTINE
+    guillotine = GuillotinePacker()
+    guillotine_rows = []
+
+    def run_guillotine(prepared_data):
+        for batch_rows in prepared_data:
+            if batch_rows:
+                guillotine_rows.extend(guillotine.pack_block(batch_rows))
+
+    print("\n--- Štatistika plechov GUILLOTINE ---")
+    timer("GUILLOTINE", run_guillotine, prepared_data)
+
+    with open('./output/guillotine_output.csv', 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerows(guillotine_rows)
+
+    avg_w, avg_w_pct = guillotine.metrics.get_sheet_avg_weight()
+    avg_area, avg_area_pct = guillotine.metrics.get_sheet_avg_area()
+
+    print(f"Priemerné zaťaženie plechu:        {avg_w:.2f} kg ({avg_w_pct:.2f} %)")
+    print(f"Priemerné využitie plochy na plech: {avg_area:.2f} cm^2 ({avg_area_pct:.2f} %)")
+    print(guillotine.metrics.report())
 
     # GRID PACKING
-    grid = GridPacking()
+    grid = GridPacking(use_tensor=True)
 
     print("\n--- Štatistika plechov GRID PACKING ---")
     timer("GRID PACKING", grid.run, prepared_data)
@@ -74,6 +113,7 @@ def main():
 
     print(f"Priemerné zaťaženie plechu: {avg_w:.2f} kg ({avg_w_pct:.2f} %)")
     print(f"Priemerné využitie plechu:  {avg_a:.2f} cm^2 ({avg_a_pct:.2f} %)")
+    print(grid.metrics.report())
 
 
 if __name__ == "__main__":
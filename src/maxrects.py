@@ -2,9 +2,11 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import List, Optional, Tuple
+from bisect import bisect_left, bisect_right
 from math import inf
 from datetime import datetime
 from models import Component
+from metrics import SheetMetrics
 from utils import calcStressSquareCoefficient, calcStressScore
 
 
@@ -105,14 +107,37 @@ class Sheet:
     free_rects: List[Rect] = field(default_factory=list)
     placements: List[Placement] = field(default_factory=list)
     current_weight: float = 0.0
+    used_area: float = 0.0       # súčet square umiestnených komponentov
+    max_free_rects: Optional[int] = None     # strop na počet voľných obdĺžnikov
+    peak_free_rects: int = 1                 # najväčší počet voľných obdĺžnikov počas plnenia (pred orezaním stropom)
 
     def __post_init__(self):
         # jeden veľký voľný obdĺžnik – celá plocha plechu
         self.free_rects = [Rect(0, 0, self.width, self.height)]
 
+    @property
+    def free_rect_count(self) -> int:
+        return len(self.free_rects)
+
     def remaining_area(self) -> int:
         return sum(r.area for r in self.free_rects)
 
+    def max_free_extents(self) -> Tuple[int, int]:
+        """
+        (najväčšia kratšia strana, najväčšia dlhšia strana) spomedzi voľných
+        obdĺžnikov. Komponent sa môže zmestiť (aj otočený) iba ak jeho kratšia
+        a dlhšia strana nie sú väčšie.
+        """
+        max_short = 0
+        max_long = 0
+        for fr in self.free_rects:
+            short, long = (fr.w, fr.h) if fr.w <= fr.h else (fr.h, fr.w)
+            if short > max_short:
+                max_short = short
+            if long > max_long:
+                max_long = long
+        return max_short, max_long
+
     # ---------- MaxRects – Best Area Fit ----------
 
     def find_position_for(self, w: int, h: int) -> Optional[Tuple[int, int]]:
@@ -140,6 +165,7 @@ class Sheet:
         placed_rect = Rect(x, y, w, h)
 
         # split voľných obdĺžnikov ...
+        new_rects: List[Rect] = []
         i = 0
         while i < len(self.free_rects):
             fr = self.free_rects[i]
@@ -148,9 +174,15 @@ class Sheet:
                 continue
 
             del self.free_rects[i]
-            self.free_rects.extend(self._split_free_rect(fr, placed_rect))
+            new_rects.extend(self._split_free_rect(fr, placed_rect))
 
-        self._prune_free_rects()
+        # staré obdĺžniky sa navzájom neobsahujú – stačí porovnať iba nové
+        for r in new_rects:
+            self._add_free_rect(r)
+        # peak sa meria pred orezaním – ukazuje, kam by F narástol bez stropu
+        self.peak_free_rects = max(self.peak_free_rects, len(self.free_rects))
+        if self.max_free_rects is not None and len(self.free_rects) > self.max_free_rects:
+            self._compact_free_rects()
 
         # kumulatívna váha po pridaní tejto súčiastky
         new_weight = self.current_weight + component.weight
@@ -158,6 +190,7 @@ class Sheet:
             Placement(component, x, y, w, h, rotated, new_weight)
         )
         self.current_weight = new_weight
+        self.used_area += component.square
 
 
     def _split_free_rect(self, free: Rect, placed: Rect) -> List[Rect]:
@@ -201,24 +234,22 @@ class Sheet:
 
         return res
 
-    def _prune_free_rects(self):
-        i = 0
-        while i < len(self.free_rects):
-            j = i + 1
-            removed = False
-            while j < len(self.free_rects):
-                r1 = self.free_rects[i]
-                r2 = self.free_rects[j]
-                if r1.contains(r2):
-                    del self.free_rects[j]
-                elif r2.contains(r1):
-                    del self.free_rects[i]
-                    removed = True
-                    break
-                else:
-                    j += 1
-            if not removed:
-                i += 1
+    def _add_free_rect(self, rect: Rect) -> bool:
+        """
+        Pridá voľný obdĺžnik, ak ho neobsahuje žiadny existujúci, a odstráni
+        existujúce obdĺžniky, ktoré obsahuje on. Vráti True, ak bol pridaný.
+        """
+        for fr in self.free_rects:
+            if fr.contains(rect):
+                return False
+        self.free_rects = [fr for fr in self.free_rects if not rect.contains(fr)]
+        self.free_rects.append(rect)
+        return True
+
+    def _compact_free_rects(self):
+        """Ponechá iba max_free_rects najväčších voľných obdĺžnikov (podmnožina voľnej plochy)."""
+        self.free_rects.sort(key=lambda r: r.area, reverse=True)
+        del self.free_rects[self.max_free_rects:]
 
 
 # ---------- MaxRectsPacker – hustotná heuristika ----------
@@ -231,13 +262,29 @@ class MaxRectsPacker:
     vyberáme komponent s |d - D| minimálnym, ktorý sa zmestí (MaxRects + váhový limit)
     """
 
+    def __init__(
+        self,
+        metrics: Optional[SheetMetrics] = None,
+        max_free_rects: Optional[int] = None,
+    ):
+        self.metrics = metrics if metrics is not None else SheetMetrics(MAX_WEIGHT, PLATE_SIZE_CM * PLATE_SIZE_CM)
+        self.max_free_rects = max_free_rects
+        self.peak_free_rects = 0     # najväčší zoznam voľných obdĺžnikov za celý beh
+
+    def pack_block(self, batch_rows: list[list]) -> List[list]:
+        """Zabalí jeden half-day blok (výstup DatasetHandleru) a vráti riadky výstupu."""
+        return sheets_to_output_rows(self.pack_batch(batch_to_components(batch_rows)))
+
     def pack_batch(self, components: List[Component]) -> List[Sheet]:
-        remaining = components.copy()
+        remaining = _RemainingIndex(components)
         sheets: List[Sheet] = []
         sheet_index = 1
 
         while remaining:
-            sheet = Sheet(index=sheet_index)
+            sheet = Sheet(
+                index=sheet_index,
+                max_free_rects=self.max_free_rects,
+            )
             sheet_index += 1
 
             placed_any = True
@@ -248,41 +295,50 @@ class MaxRectsPacker:
                 if rem_area <= 0:
                     break
 
+                # nič sa nezmestí váhovo ani rozmerovo → plech hneď zavri
+                weight_budget = sheet.max_weight - sheet.current_weight
+                max_short, max_long = sheet.max_free_extents()
+                if not remaining.any_feasible(weight_budget, max_short, max_long):
+                    break
+
                 # cieľový stres plechu D
                 sheet_stress = calcStressSquareCoefficient(
                     sheet.current_weight, rem_area
                 )
 
-                best_idx: Optional[int] = None
+                best_seq: Optional[int] = None
                 best_pos: Optional[Tuple[int, int]] = None
                 best_rot = False
                 best_score = inf
 
-                for idx, comp in enumerate(remaining):
-                    # hmotnostný limit
-                    if sheet.current_weight + comp.weight > sheet.max_weight:
+                # iba komponenty v rámci váhového limitu (zoradené podľa váhy)
+                for seq, comp in remaining.within_weight(sheet.current_weight, sheet.max_weight):
+                    w, h = comp.dims
+                    if min(w, h) > max_short or max(w, h) > max_long:
                         continue
 
-                    w, h = comp.dims
+                    comp_stress = comp.stress_square
+                    score = abs(
+                        calcStressScore(comp_stress, sheet_stress)
+                    )  # ~ |d - D|
+
+                    # pri rovnakom skóre vyhráva skorší komponent (pôvodné poradie)
+                    if score > best_score or (score == best_score and seq > best_seq):
+                        continue
 
                     for rotated, (cw, ch) in [(False, (w, h)), (True, (h, w))]:
                         pos = sheet.find_position_for(cw, ch)
                         if pos is None:
                             continue
 
-                        comp_stress = comp.stress_square
-                        score = abs(
-                            calcStressScore(comp_stress, sheet_stress)
-                        )  # ~ |d - D|
-
-                        if score < best_score:
-                            best_score = score
-                            best_idx = idx
-                            best_pos = pos
-                            best_rot = rotated
+                        best_score = score
+                        best_seq = seq
+                        best_pos = pos
+                        best_rot = rotated
+                        break
 
-                if best_idx is not None and best_pos is not None:
-                    comp = remaining.pop(best_idx)
+                if best_seq is not None and best_pos is not None:
+                    comp = remaining.pop(best_seq)
                     w, h = comp.dims
                     if best_rot:
                         w, h = h, w
@@ -294,12 +350,64 @@ class MaxRectsPacker:
 
             if sheet.placements:
                 sheets.append(sheet)
+                self.metrics.add_sheet(sheet.current_weight, sheet.used_area)
+                self.peak_free_rects = max(self.peak_free_rects, sheet.peak_free_rects)
             else:
                 break  # bezpečnostná brzda
 
+        self.metrics.end_block(len(sheets))
         return sheets
 
 
+class _RemainingIndex:
+    """
+    Zvyšné komponenty bloku v troch zoradených indexoch: podľa váhy, podľa
+    kratšej a podľa dlhšej strany. Kľúče nesú aj pôvodné poradie (seq),
+    aby sa zachovalo rozhodovanie pri rovnakom skóre.
+    """
+
+    def __init__(self, components: List[Component]):
+        self._comps = dict(enumerate(components))
+        self._by_weight = sorted((c.weight, seq) for seq, c in self._comps.items())
+        self._by_short = sorted((min(c.dims), seq) for seq, c in self._comps.items())
+        self._by_long = sorted((max(c.dims), seq) for seq, c in self._comps.items())
+
+    def __len__(self) -> int:
+        return len(self._comps)
+
+    def within_weight(self, current_weight: float, max_weight: float):
+        """Komponenty, ktoré sa zmestia do váhového limitu (bisect na hranicu)."""
+        # rovnaká podmienka ako current_weight + weight <= max_weight
+        end = bisect_right(self._by_weight, (max_weight - current_weight, inf))
+        while end > 0 and current_weight + self._by_weight[end - 1][0] > max_weight:
+            end -= 1
+        while end < len(self._by_weight) and current_weight + self._by_weight[end][0] <= max_weight:
+            end += 1
+        for _, seq in self._by_weight[:end]:
+            yield seq, self._comps[seq]
+
+    def any_feasible(self, weight_budget: float, max_short: int, max_long: int) -> bool:
+        """Nutná podmienka: najľahší, najkratší a najužší komponent sa ešte zmestia."""
+        if not self._comps:
+            return False
+        return (
+            self._by_weight[0][0] <= weight_budget + 1e-9 and
+            self._by_short[0][0] <= max_short and
+            self._by_long[0][0] <= max_long
+        )
+
+    def pop(self, seq: int) -> Component:
+        comp = self._comps.pop(seq)
+        w, h = comp.dims
+        for keys, key in (
+            (self._by_weight, (comp.weight, seq)),
+            (self._by_short, (min(w, h), seq)),
+            (self._by_long, (max(w, h), seq)),
+        ):
+            del keys[bisect_left(keys, key)]
+        return comp
+
+
 def sheets_to_output_rows(sheets: List[Sheet]) -> List[list]:
     """
     Výstup:
@@ -0,0 +1,248 @@
+# src/metrics.py
+import math
+import threading
+
+SHEET_MAX_WEIGHT = 200.0          # kg
+SHEET_AREA = 500.0 * 500.0        # cm^2
+HIST_BINS = 100                   # 1 % na jeden bin
+
+
+class ExactSum:
+    """
+    Presný súčet floatov (Shewchukove čiastkové súčty, ako math.fsum).
+    Výsledok nezávisí od poradia sčítania ani od toho, ako sa súčty
+    rozdelia a spoja – napr. pri shardovanom behu.
+    """
+
+    def __init__(self, partials=None):
+        self.partials = list(partials or [])
+
+    def add(self, x):
+        i = 0
+        for y in self.partials:
+            if abs(x) < abs(y):
+                x, y = y, x
+            hi = x + y
+            lo = y - (hi - x)
+            if lo:
+                self.partials[i] = lo
+                i += 1
+            x = hi
+        self.partials[i:] = [x]
+
+    def merge(self, other):
+        for x in other.partials:
+            self.add(x)
+
+    @property
+    def value(self):
+        return math.fsum(self.partials)
+
+    def canonical(self):
+        """
+        Jednoznačný zápis súčtu: [v1, v2, ...], kde v1 je zaokrúhlený súčet
+        a každý ďalší člen zaokrúhlený zvyšok. Rovnaký súčet -> rovnaký zoznam.
+        """
+        parts = list(self.partials)
+        result = []
+        while True:
+            v = math.fsum(parts)
+            if not v:
+                return result
+            result.append(v)
+            parts.append(-v)
+
+
+class SheetMetrics:
+    """
+    Priebežné štatistiky plechov.
+
+    Packery volajú add_sheet() pri uzavretí plechu a end_block() na konci
+    half-day bloku. Drží iba súčty a histogramy s pevným počtom binov,
+    takže pamäť nezávisí od počtu plechov ani blokov a report je dostupný
+    kedykoľvek počas behu aj po ňom. Čítanie ide cez snapshot() pod zámkom,
+    packery môžu medzitým v iných vláknach pridávať plechy.
+    """
+
+    def __init__(self, max_weight=SHEET_MAX_WEIGHT, sheet_area=SHEET_AREA, bins=HIST_BINS):
+        self.max_weight = max_weight
+        self.sheet_area = sheet_area
+        self.bins = bins
+
+        self.sheet_count = 0
+        self._weight_sum = ExactSum()
+        self._area_sum = ExactSum()
+        self.weight_hist = [0] * bins      # histogram zaťaženia v %
+        self.area_hist = [0] * bins        # histogram využitia plochy v %
+        # počet plechov na blok: počet blokov, súčet, minimum a maximum
+        self.block_count = 0
+        self.block_sheets_sum = 0
+        self.block_sheets_min = None
+        self.block_sheets_max = None
+
+        self._lock = threading.Lock()
+
+    # --------- AKTUALIZACIA ---------
+    def add_sheet(self, weight, area):
+        weight_pct = weight / self.max_weight * 100.0
+        area_pct = area / self.sheet_area * 100.0
+        with self._lock:
+            self.sheet_count += 1
+            self._weight_sum.add(weight)
+            self._area_sum.add(area)
+            self.weight_hist[self._bin(weight_pct)] += 1
+            self.area_hist[self._bin(area_pct)] += 1
+
+    def end_block(self, sheet_count):
+        with self._lock:
+            self._add_blocks(1, sheet_count, sheet_count, sheet_count)
+
+    def merge(self, other):
+        """Pripočíta štatistiky iného agregátora (napr. z iného shardu)."""
+        if other.bins != self.bins:
+            raise ValueError("Nedajú sa spojiť histogramy s rôznym počtom binov")
+        other = other.snapshot()
+        with self._lock:
+            self.sheet_count += other.sheet_count
+            self._weight_sum.merge(other._weight_sum)
+            self._area_sum.merge(other._area_sum)
+            self.weight_hist = [a + b for a, b in zip(self.weight_hist, other.weight_hist)]
+            self.area_hist = [a + b for a, b in zip(self.area_hist, other.area_hist)]
+            if other.block_count:
+                self._add_blocks(
+                    other.block_count, other.block_sheets_sum,
+                    other.block_sheets_min, other.block_sheets_max,
+                )
+
+    def snapshot(self):
+        """Konzistentná kópia štatistík, z ktorej sa dá čítať bez zámku."""
+        with self._lock:
+            snap = SheetMetrics(self.max_weight, self.sheet_area, self.bins)
+            snap.sheet_count = self.sheet_count
+            snap._weight_sum = ExactSum(self._weight_sum.partials)
+            snap._area_sum = ExactSum(self._area_sum.partials)
+            snap.weight_hist = list(self.weight_hist)
+            snap.area_hist = list(self.area_hist)
+            snap.block_count = self.block_count
+            snap.block_sheets_sum = self.block_sheets_sum
+            snap.block_sheets_min = self.block_sheets_min
+            snap.block_sheets_max = self.block_sheets_max
+        return snap
+
+    # --------- SERIALIZACIA ---------
+    def to_dict(self):
+        snap = self.snapshot()
+        return {
+            'max_weight': snap.max_weight,
+            'sheet_area': snap.sheet_area,
+            'bins': snap.bins,
+            'sheet_count': snap.sheet_count,
+            'total_weight': snap._weight_sum.value,
+            'total_area': snap._area_sum.value,
+            'weight_partials': snap._weight_sum.canonical(),
+            'area_partials': snap._area_sum.canonical(),
+            'weight_hist': snap.weight_hist,
+            'area_hist': snap.area_hist,
+            'block_count': snap.block_count,
+            'block_sheets_sum': snap.block_sheets_sum,
+            'block_sheets_min': snap.block_sheets_min,
+            'block_sheets_max': snap.block_sheets_max,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        metrics = cls(data['max_weight'], data['sheet_area'], data['bins'])
+        metrics.sheet_count = data['sheet_count']
+        metrics._weight_sum = ExactSum(data['weight_partials'])
+        metrics._area_sum = ExactSum(data['area_partials'])
+        metrics.weight_hist = list(data['weight_hist'])
+        metrics.area_hist = list(data['area_hist'])
+        metrics.block_count = data['block_count']
+        metrics.block_sheets_sum = data['block_sheets_sum']
+        metrics.block_sheets_min = data['block_sheets_min']
+        metrics.block_sheets_max = data['block_sheets_max']
+        return metrics
+
+    # --------- GETTERY ---------
+    @property
+    def total_weight(self):
+        with self._lock:
+            return self._weight_sum.value
+
+    @property
+    def total_area(self):
+        with self._lock:
+            return self._area_sum.value
+
+    def get_sheet_avg_weight(self):
+        """(priemerná váha na plech v kg, priemerné zaťaženie v %)"""
+        with self._lock:
+            count, total = self.sheet_count, self._weight_sum.value
+        if not count:
+            return 0.0, 0.0
+        avg_w = total / count
+        return avg_w, avg_w / self.max_weight * 100.0
+
+    def get_sheet_avg_area(self):
+        """(priemerná zabratá plocha v cm^2, priemerné využitie plochy v %)"""
+        with self._lock:
+            count, total = self.sheet_count, self._area_sum.value
+        if not count:
+            return 0.0, 0.0
+        avg_a = total / count
+        return avg_a, avg_a / self.sheet_area * 100.0
+
+    def weight_percentile(self, q):
+        """q-ty percentil zaťaženia plechu v % (odhad z histogramu)."""
+        with self._lock:
+            hist = list(self.weight_hist)
+        return self._percentile(hist, q)
+
+    def area_percentile(self, q):
+        """q-ty percentil využitia plochy plechu v % (odhad z histogramu)."""
+        with self._lock:
+            hist = list(self.area_hist)
+        return self._percentile(hist, q)
+
+    def report(self):
+        snap = self.snapshot()
+        avg_w, avg_w_pct = snap.get_sheet_avg_weight()
+        avg_a, avg_a_pct = snap.get_sheet_avg_area()
+        blocks = snap.block_count
+        per_block = snap.block_sheets_sum / blocks if blocks else 0.0
+        return "\n".join([
+            f"Plechov: {snap.sheet_count} v {blocks} blokoch ({per_block:.2f} na blok, "
+            f"min {snap.block_sheets_min or 0}, max {snap.block_sheets_max or 0})",
+            f"Zaťaženie: priemer {avg_w:.2f} kg ({avg_w_pct:.2f} %), "
+            f"p50/p95/p99 {snap.weight_percentile(50):.1f} / "
+            f"{snap.weight_percentile(95):.1f} / {snap.weight_percentile(99):.1f} %",
+            f"Plocha:    priemer {avg_a:.2f} cm^2 ({avg_a_pct:.2f} %), "
+            f"p50/p95/p99 {snap.area_percentile(50):.1f} / "
+            f"{snap.area_percentile(95):.1f} / {snap.area_percentile(99):.1f} %",
+        ])
+
+    # --------- POMOCNE ---------
+    def _add_blocks(self, count, total, low, high):
+        # volá sa pod self._lock
+        self.block_count += count
+        self.block_sheets_sum += total
+        self.block_sheets_min = low if self.block_sheets_min is None else min(self.block_sheets_min, low)
+        self.block_sheets_max = high if self.block_sheets_max is None else max(self.block_sheets_max, high)
+
+    def _bin(self, pct):
+        idx = int(pct * self.bins / 100.0)
+        return min(max(idx, 0), self.bins - 1)
+
+    def _percentile(self, hist, q):
+        n = sum(hist)
+        if not n:
+            return 0.0
+        width = 100.0 / self.bins
+        target = q / 100.0 * n
+        cum = 0
+        for i, c in enumerate(hist):
+            if c and cum + c >= target:
+                # lineárna interpolácia v rámci binu
+                return (i + (target - cum) / c) * width
+            cum += c
+        return 100.0
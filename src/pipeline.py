@@ -0,0 +1,181 @@
+# src/pipeline.py
+import argparse
+import csv
+import queue
+import threading
+import time
+
+from dataset_handler import DatasetHandler
+from engines import ENGINES, make_packer
+from metrics import SheetMetrics
+
+_STOP = object()   # značka konca prúdu v queue
+
+
+class Pipeline:
+    """
+    Prúdové spracovanie: loader -> packer(y) -> writer.
+
+    Stupne sú prepojené ohraničenými queue, takže rýchlejší stupeň čaká
+    na pomalší (backpressure) a pamäť drží iba niekoľko blokov naraz.
+    Writer zapisuje bloky v pôvodnom poradí aj pri viacerých packeroch.
+    """
+
+    def __init__(self, path, algo, output_path=None, workers=1, queue_size=4, progress=False,
+                 start=None, end=None):
+        if algo not in ENGINES:
+            raise ValueError(f"Neznámy algoritmus '{algo}', dostupné: {', '.join(ENGINES)}")
+        self.path = path
+        self.start = start     # voliteľný rozsah timestampov [start, end)
+        self.end = end
+        self.algo = algo
+        self.output_path = output_path or f'./output/{algo}_output.csv'
+        self.workers = max(1, workers)
+        self.progress = progress
+        self.metrics = SheetMetrics()    # zdieľané všetkými packermi
+
+        self._in_q = queue.Queue(maxsize=queue_size)
+        self._out_q = queue.Queue(maxsize=queue_size)
+        self._abort = threading.Event()
+        self._error = None
+
+        # merania
+        self.blocks = 0
+        self.rows = 0
+        self.first_output_s = None
+        self.total_s = None
+
+    # --------- MAIN ---------
+    def run(self):
+        self._start = time.perf_counter()
+
+        threads = [threading.Thread(target=self._guard, args=(self._load,), name='loader')]
+        threads += [
+            threading.Thread(target=self._guard, args=(self._pack,), name=f'packer-{i}')
+            for i in range(self.workers)
+        ]
+        threads.append(threading.Thread(target=self._guard, args=(self._write,), name='writer'))
+
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        if self._error is not None:
+            raise self._error
+
+        self.total_s = time.perf_counter() - self._start
+        return self
+
+    # --------- STUPNE ---------
+    def _load(self):
+        ds_h = DatasetHandler(self.path)
+        ds_h.load(self.start, self.end)
+        for idx, block in enumerate(ds_h.iter_blocks()):
+            self._put(self._in_q, (idx, block))
+        for _ in range(self.workers):
+            self._put(self._in_q, _STOP)
+
+    def _pack(self):
+        packer = make_packer(self.algo, metrics=self.metrics)
+        while True:
+            item = self._get(self._in_q)
+            if item is _STOP:
+                self._put(self._out_q, _STOP)
+                return
+            idx, block = item
+            rows = packer.pack_block(block) if block else []
+            self._put(self._out_q, (idx, rows))
+
+    def _write(self):
+        pending = {}      # bloky, ktoré prišli mimo poradia
+        next_idx = 0
+        stopped = 0
+
+        with open(self.output_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            while stopped < self.workers:
+                item = self._get(self._out_q)
+                if item is _STOP:
+                    stopped += 1
+                    continue
+
+                idx, rows = item
+                pending[idx] = rows
+                while next_idx in pending:
+                    rows = pending.pop(next_idx)
+                    writer.writerows(rows)
+                    f.flush()
+                    if self.first_output_s is None:
+                        self.first_output_s = time.perf_counter() - self._start
+                    self.blocks += 1
+                    self.rows += len(rows)
+                    next_idx += 1
+                    if self.progress:
+                        self._print_progress()
+
+    # --------- POMOCNE ---------
+    def _print_progress(self):
+        snap = self.metrics.snapshot()
+        _, avg_w_pct = snap.get_sheet_avg_weight()
+        _, avg_a_pct = snap.get_sheet_avg_area()
+        print(
+            f"[{self.algo}] blok {self.blocks}: plechov {snap.sheet_count}, "
+            f"zaťaženie {avg_w_pct:.2f} %, plocha {avg_a_pct:.2f} %"
+        )
+
+    def _guard(self, stage):
+        try:
+            stage()
+        except BaseException as e:
+            if self._error is None:
+                self._error = e
+            self._abort.set()
+
+    def _put(self, q, item):
+        while not self._abort.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise _Aborted()
+
+    def _get(self, q):
+        while not self._abort.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        raise _Aborted()
+
+
+class _Aborted(Exception):
+    """Iný stupeň zlyhal – ukonči aktuálny stupeň."""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prúdový beh packingu (loader -> packer -> writer).")
+    parser.add_argument('--path', default='./data/dataset.csv', help="CSV alebo .parquet")
+    parser.add_argument('--start', help="začiatok rozsahu timestampov, napr. 2025-09-17")
+    parser.add_argument('--end', help="koniec rozsahu (bez), napr. 2025-09-18")
+    parser.add_argument('--algo', choices=list(ENGINES), nargs='+', default=list(ENGINES))
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--queue-size', type=int, default=4)
+    parser.add_argument('--progress', action='store_true', help="priebežné štatistiky po každom bloku")
+    args = parser.parse_args()
+
+    for algo in args.algo:
+        p = Pipeline(
+            args.path, algo, workers=args.workers, queue_size=args.queue_size, progress=args.progress,
+            start=args.start, end=args.end,
+        ).run()
+        print(f"\n--- PIPELINE {algo.upper()} ---")
+        print(f"Blokov: {p.blocks}, riadkov: {p.rows} -> {p.output_path}")
+        first = f"{p.first_output_s:.4f} s" if p.first_output_s is not None else "-"
+        print(f"Prvý výstup: {first}, celkový čas: {p.total_s:.4f} s")
+        print(p.metrics.report())
+
+
+if __name__ == "__main__":
+    main()
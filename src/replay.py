@@ -0,0 +1,147 @@
+# src/replay.py
+import argparse
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from dataset_handler import DatasetHandler
+from engines import ENGINES, make_packer
+
+
+def load_arrivals(path, start=None, end=None, hours=None):
+    """
+    Vráti zoznam príchodov (offset v s od prvého príchodu, index bloku, riadok)
+    zoradený podľa timestampu. hours voliteľne obmedzí okno od prvého príchodu.
+    """
+    ds_h = DatasetHandler(path)
+    ds_h.load(start, end)
+
+    arrivals = []
+    t0 = None
+    for block_idx, block in enumerate(ds_h.iter_blocks()):
+        for row in block:
+            ts = datetime.fromisoformat(f"{row[3]} {row[4]}")
+            if t0 is None:
+                t0 = ts
+            if hours is not None and ts - t0 >= timedelta(hours=hours):
+                return arrivals
+            arrivals.append(((ts - t0).total_seconds(), block_idx, row))
+    return arrivals
+
+
+class Replay:
+    """
+    Prehrá príchody súčiastok v reálnom alebo zrýchlenom čase do jedného packeru.
+
+    Generátor pridáva súčiastky do fronty v čase offset / speedup. Packer
+    vždy zoberie všetko, čo medzitým prišlo, pridá to k doteraz prijatej
+    časti half-day bloku a zabalí celý tento prefix bloku jedným volaním
+    pack_block() – teda rovnaké priradenie plechov, aké by engine dal pre
+    blok v danom okamihu. Latencia súčiastky je čas od jej plánovaného
+    príchodu po dokončenie prvého balenia, ktoré ju obsahuje.
+    """
+
+    def __init__(self, arrivals, algo, speedup):
+        self.arrivals = arrivals
+        self.algo = algo
+        self.speedup = speedup
+
+        self.latencies = []    # v sekundách, pre každý príchod
+        self.batches = 0
+        self.wall_s = None
+
+        self._pending = []
+        self._done = False
+        self._cond = threading.Condition()
+
+    def run(self):
+        self._start = time.perf_counter()
+
+        producer = threading.Thread(target=self._produce, name='replay-producer')
+        producer.start()
+
+        block_idx = None
+        block_rows = []     # doteraz prijatá časť aktuálneho bloku
+
+        while True:
+            with self._cond:
+                while not self._pending and not self._done:
+                    self._cond.wait()
+                if not self._pending:
+                    break
+                batch = self._take_batch()
+
+            if batch[0][1] != block_idx:
+                block_idx = batch[0][1]
+                block_rows = []
+            block_rows.extend(row for _, _, row in batch)
+
+            make_packer(self.algo).pack_block(block_rows)
+            finished = time.perf_counter()
+            self.latencies.extend(finished - arrived for arrived, _, _ in batch)
+            self.batches += 1
+
+        producer.join()
+        self.wall_s = time.perf_counter() - self._start
+        return self
+
+    def _produce(self):
+        for offset, block_idx, row in self.arrivals:
+            arrival = self._start + offset / self.speedup
+            delay = arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            with self._cond:
+                self._pending.append((arrival, block_idx, row))
+                self._cond.notify()
+        with self._cond:
+            self._done = True
+            self._cond.notify()
+
+    def _take_batch(self):
+        # dávka nesmie prekročiť hranicu half-day bloku
+        block_idx = self._pending[0][1]
+        n = 0
+        while n < len(self._pending) and self._pending[n][1] == block_idx:
+            n += 1
+        batch = self._pending[:n]
+        del self._pending[:n]
+        return batch
+
+    def percentiles_ms(self):
+        if not self.latencies:
+            return 0.0, 0.0, 0.0, 0.0
+        lat = np.array(self.latencies) * 1000.0
+        p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+        return p50, p95, p99, lat.max()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prehratie príchodov súčiastok a meranie latencie priradenia plechu.")
+    parser.add_argument('--path', default='./data/dataset.csv', help="CSV alebo .parquet")
+    parser.add_argument('--start', help="začiatok rozsahu timestampov, napr. 2025-09-17")
+    parser.add_argument('--end', help="koniec rozsahu (bez), napr. 2025-09-18")
+    parser.add_argument('--hours', type=float, default=12.0, help="dĺžka prehrávaného okna v hodinách datasetu")
+    parser.add_argument('--algo', choices=list(ENGINES), nargs='+', default=list(ENGINES))
+    parser.add_argument('--speedups', type=float, nargs='+', default=[10000, 100000, 1000000],
+                        help="zrýchlenia oproti reálnemu času, napr. 1000 10000")
+    args = parser.parse_args()
+
+    arrivals = load_arrivals(args.path, args.start, args.end, args.hours)
+    span_s = arrivals[-1][0] if arrivals else 0.0
+    print(f"Príchodov: {len(arrivals)}, okno {span_s / 3600:.2f} h")
+
+    print(f"\n{'algoritmus':<12} {'zrýchlenie':>10} {'dávok':>6} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'max ms':>9} {'beh s':>7}")
+    for algo in args.algo:
+        for speedup in sorted(args.speedups):
+            r = Replay(arrivals, algo, speedup).run()
+            p50, p95, p99, p_max = r.percentiles_ms()
+            print(f"{algo:<12} {speedup:>9g}x {r.batches:>6} {p50:>9.2f} {p95:>9.2f} "
+                  f"{p99:>9.2f} {p_max:>9.2f} {r.wall_s:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+# src/service.py
+import argparse
+import asyncio
+import http.client
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from engines import ENGINES, make_packer
+
+CHUNK_ROWS = 200   # počet riadkov v jednom HTTP chunku
+
+
+class PackingError(Exception):
+    """Packer zlyhal na konkrétnom bloku (napr. komponent sa nezmestí na plech)."""
+
+
+# --------- WORKER (beží v procese poolu) ---------
+
+def _warm_worker():
+    """Initializer poolu – moduly packerov sú importované raz pri štarte procesu."""
+    for algo in ENGINES:
+        make_packer(algo)
+
+
+def _pack_many(algo, blocks):
+    """
+    Zabalí dávku blokov jedným volaním do workera. Pre každý blok vráti
+    (riadky, čas balenia v s), alebo (PackingError, None), ak packer zlyhal –
+    chybný blok tak neovplyvní ostatné požiadavky v dávke.
+    """
+    results = []
+    for block in blocks:
+        start = time.perf_counter()
+        try:
+            rows = make_packer(algo).pack_block(block) if block else []
+        except Exception as e:
+            # výnimku packeru nemusí byť možné preniesť cez pickle, posiela sa text
+            results.append((PackingError(f"{type(e).__name__}: {e}"), None))
+            continue
+        results.append((rows, time.perf_counter() - start))
+    return results
+
+
+# --------- DAVKOVANIE ---------
+
+class Batcher:
+    """
+    Zbiera súbežné malé požiadavky pre jeden algoritmus. Blok s menej ako
+    coalesce_rows riadkami čaká na ďalšie; dávka sa odošle do poolu, keď
+    uplynie batch_window od prvej požiadavky alebo keď súčet riadkov
+    dosiahne max_batch_rows. Malé bloky tak zdieľajú jednu réžiu IPC.
+    Väčší blok ide do poolu hneď sám – worker balí bloky dávky za sebou
+    a odpoveď by čakala na balenie všetkých ostatných.
+    Ak sa pool rozbije, zavolá on_broken(executor) a dávka skončí chybou.
+    """
+
+    def __init__(self, algo, executor, batch_window, max_batch_rows, coalesce_rows, on_broken=None):
+        self.algo = algo
+        self.executor = executor
+        self.on_broken = on_broken
+        self.batch_window = batch_window
+        self.max_batch_rows = max_batch_rows
+        self.coalesce_rows = coalesce_rows
+        self._queue = asyncio.Queue()
+        self._runs = set()      # bežiace dávky – event loop drží iba slabé referencie
+        self._task = asyncio.create_task(self._loop())
+
+    async def pack(self, block):
+        future = asyncio.get_running_loop().create_future()
+        if len(block) >= self.coalesce_rows:
+            self._start([(block, future)])
+        else:
+            await self._queue.put((block, future))
+        return await future
+
+    async def _loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            rows = len(batch[0][0])
+            deadline = loop.time() + self.batch_window
+
+            while rows < self.max_batch_rows:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                rows += len(item[0])
+
+            self._start(batch)
+
+    def _start(self, batch):
+        task = asyncio.create_task(self._run(batch))
+        self._runs.add(task)
+        task.add_done_callback(self._runs.discard)
+
+    async def _run(self, batch):
+        loop = asyncio.get_running_loop()
+        blocks = [block for block, _ in batch]
+        executor = self.executor
+        try:
+            results = await loop.run_in_executor(executor, _pack_many, self.algo, blocks)
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool) and self.on_broken is not None:
+                self.on_broken(executor)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), (result, pack_s) in zip(batch, results):
+            if future.done():
+                continue
+            if pack_s is None:
+                future.set_exception(result)
+            else:
+                future.set_result((result, pack_s))
+
+    def close(self):
+        self._task.cancel()
+
+
+# --------- HTTP ---------
+
+class PackingService:
+    """
+    Dlhobežiaca packing služba na localhoste.
+
+    POST /pack  {"algo": "maxrects", "block": [[sn, [w, h], weight, date, time, square, stress], ...]}
+        -> chunked NDJSON: jeden riadok výstupu na riadok, na konci {"done": true, ...}
+    GET /health -> {"status": "ok", "algos": [...]}
+
+    Chyby: 400 zlá požiadavka, 422 packer blok nezabalil, 500 zlyhanie
+    workera (rozbitý pool sa nahradí novým).
+    """
+
+    def __init__(
+        self, host='127.0.0.1', port=8765, workers=2,
+        batch_window_ms=5.0, max_batch_rows=200, coalesce_rows=50,
+    ):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch_rows = max_batch_rows
+        self.coalesce_rows = coalesce_rows
+        self._executor = None
+        self._batchers = {}
+        self._warming = None
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+
+    def _replace_executor(self, broken):
+        """Nahradí rozbitý pool novým (iba raz, aj keď zlyhá viac dávok naraz)."""
+        if self._executor is not broken:
+            return
+        print("Pool workerov sa rozbil, spúšťam nový")
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._new_executor()
+        for batcher in self._batchers.values():
+            batcher.executor = self._executor
+        self._warming = asyncio.create_task(self._warm(self._executor))
+        # ak sa rozbije aj nový pool, ohlási a nahradí ho prvá dávka, ktorá
+        # ho použije – výnimka z rozohrievania sa len prevezme
+        self._warming.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    async def _warm(self, executor):
+        """Spustí všetky procesy poolu a v každom importuje packery."""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(executor, _pack_many, algo, [])
+            for algo in list(ENGINES) * self.workers
+        ])
+
+    async def serve(self):
+        self._executor = self._new_executor()
+        # zahrej všetky procesy poolu ešte pred prvou požiadavkou
+        await self._warm(self._executor)
+        self._batchers = {
+            algo: Batcher(
+                algo, self._executor, self.batch_window, self.max_batch_rows,
+                self.coalesce_rows, on_broken=self._replace_executor,
+            )
+            for algo in ENGINES
+        }
+
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        print(f"Packing služba beží na http://{self.host}:{self.port} ({self.workers} workerov)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for batcher in self._batchers.values():
+                batcher.close()
+            self._executor.shutdown(cancel_futures=True)
+
+    async def _handle(self, reader, writer):
+        try:
+            method, path, body = await self._read_request(reader)
+            if method == 'GET' and path == '/health':
+                await self._send_json(writer, 200, {"status": "ok", "algos": list(ENGINES)})
+            elif method == 'POST' and path == '/pack':
+                await self._pack(writer, body)
+            else:
+                await self._send_json(writer, 404, {"error": f"{method} {path} neexistuje"})
+        except (ValueError, KeyError, TypeError) as e:
+            await self._send_json(writer, 400, {"error": str(e)})
+        except PackingError as e:
+            await self._send_json(writer, 422, {"error": str(e)})
+        except ConnectionError:
+            pass
+        except BrokenProcessPool:
+            await self._send_json(writer, 500, {"error": "worker packeru neočakávane skončil"})
+        except Exception as e:
+            await self._send_json(writer, 500, {"error": f"{type(e).__name__}: {e}"})
+        finally:
+            writer.close()
+
+    async def _pack(self, writer, body):
+        request = json.loads(body)
+        algo = request['algo']
+        block = request['block']
+        if algo not in ENGINES:
+            raise ValueError(f"Neznámy algoritmus '{algo}', dostupné: {', '.join(ENGINES)}")
+        if not isinstance(block, list):
+            raise TypeError("block musí byť zoznam riadkov")
+
+        start = time.perf_counter()
+        rows, pack_s = await self._batchers[algo].pack(block)
+
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: application/x-ndjson\r\n"
+            b"Transfer-Encoding: chunked\r\n"
+            b"Connection: close\r\n\r\n"
+        )
+        for i in range(0, len(rows), CHUNK_ROWS):
+            lines = "".join(json.dumps(row) + "\n" for row in rows[i:i + CHUNK_ROWS])
+            self._write_chunk(writer, lines.encode())
+            await writer.drain()
+
+        summary = {
+            "done": True,
+            "rows": len(rows),
+            "pack_ms": pack_s * 1000.0,
+            "total_ms": (time.perf_counter() - start) * 1000.0,
+        }
+        self._write_chunk(writer, (json.dumps(summary) + "\n").encode())
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    @staticmethod
+    async def _read_request(reader):
+        request_line = (await reader.readline()).decode('latin-1').strip()
+        if not request_line:
+            raise ValueError("prázdna požiadavka")
+        method, path, _ = request_line.split(' ', 2)
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get('content-length', 0))
+        body = await reader.readexactly(length) if length else b''
+        return method, path.split('?', 1)[0], body
+
+    @staticmethod
+    def _write_chunk(writer, data):
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+    @staticmethod
+    async def _send_json(writer, status, payload):
+        data = json.dumps(payload).encode()
+        reason = {
+            200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+            422: 'Unprocessable Entity', 500: 'Internal Server Error',
+        }.get(status, 'Error')
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: close\r\n\r\n".encode() + data
+        )
+        await writer.drain()
+
+
+# --------- KLIENT ---------
+
+def _json_default(value):
+    # numpy skaláry (napr. z iného zdroja dát) -> python typy
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} sa nedá serializovať do JSON")
+
+
+def pack_remote(block, algo='maxrects', host='127.0.0.1', port=8765):
+    """
+    Pošle half-day blok bežiacej službe a vráti (riadky výstupu, súhrn).
+    Blok má rovnaký formát ako prvok z DatasetHandler.prepare_data().
+    """
+    conn = http.client.HTTPConnection(host, port)
+    try:
+        body = json.dumps({"algo": algo, "block": block}, default=_json_default)
+        conn.request('POST', '/pack', body=body, headers={'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        if response.status != 200:
+            raise RuntimeError(f"Služba vrátila {response.status}: {response.read().decode()}")
+
+        rows = []
+        summary = None
+        for line in response:
+            item = json.loads(line)
+            if isinstance(item, dict) and item.get('done'):
+                summary = item
+            else:
+                rows.append(item)
+        return rows, summary
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lokálna packing služba s teplými workermi.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--batch-window-ms', type=float, default=5.0)
+    parser.add_argument('--max-batch-rows', type=int, default=200)
+    parser.add_argument('--coalesce-rows', type=int, default=50,
+                        help="bloky s menej riadkami sa zlučujú do dávok, väčšie idú hneď")
+    args = parser.parse_args()
+
+    service = PackingService(
+        args.host, args.port, args.workers, args.batch_window_ms, args.max_batch_rows,
+        args.coalesce_rows,
+    )
+    try:
+        asyncio.run(service.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+# src/shards.py
+import argparse
+import csv
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+import pandas as pd
+
+from dataset_handler import DatasetHandler
+from engines import ENGINES, make_packer
+from metrics import SheetMetrics
+
+MANIFEST = 'manifest.json'
+
+
+# --------- POMOCNE ---------
+
+def _write_atomic(path, text):
+    """Zápis cez dočasný súbor a os.replace – čitateľ nikdy nevidí polovičný súbor."""
+    # pid nestačí – na zdieľanom disku môžu mať workery rôznych hostov rovnaký pid
+    tmp = f"{path}.tmp-{uuid.uuid4().hex}"
+    with open(tmp, 'w', newline='') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _dump_json(data):
+    return json.dumps(data, indent=2, sort_keys=True, ensure_ascii=False) + "\n"
+
+
+# --------- PLAN ---------
+
+def plan(inputs, root, days_per_shard=1, algos=None, force=False):
+    """
+    Rozdelí vstupy na shardy po days_per_shard dňoch a zapíše manifest.
+    Half-day bloky nikdy neprekračujú hranicu dňa, takže shardy sa dajú
+    baliť nezávisle. Vráti manifest.
+    """
+    manifest_path = os.path.join(root, MANIFEST)
+    if os.path.exists(manifest_path) and not force:
+        raise FileExistsError(f"{manifest_path} už existuje (použi --force)")
+
+    algos = list(algos or ENGINES)
+    unknown = [a for a in algos if a not in ENGINES]
+    if unknown:
+        raise ValueError(f"Neznáme algoritmy: {', '.join(unknown)}")
+
+    shards = []
+    for path in inputs:
+        df = DatasetHandler(path).load()
+        ts = pd.to_datetime(df['timestamp'], errors='coerce').dropna()
+        days = sorted(ts.dt.date.unique())
+
+        for i in range(0, len(days), days_per_shard):
+            chunk = days[i:i + days_per_shard]
+            shards.append({
+                'id': f"{len(shards):04d}",
+                'input': path,
+                'start': chunk[0].isoformat(),
+                'end': (chunk[-1] + timedelta(days=1)).isoformat(),   # bez
+            })
+
+    manifest = {'algos': algos, 'shards': shards}
+    for sub in ('claims', 'done', 'parts'):
+        os.makedirs(os.path.join(root, sub), exist_ok=True)
+    _write_atomic(manifest_path, _dump_json(manifest))
+    return manifest
+
+
+# --------- FRONTA ---------
+
+class ShardQueue:
+    """
+    Lokálna fronta shardov nad zdieľaným adresárom.
+
+    Shard si worker zaberie vytvorením claims/<id>.<generácia>.lock cez
+    O_CREAT | O_EXCL, čo uspeje práve jednému procesu (aj viacerým hostom na
+    zdieľanom disku). Hotový shard má done/<id>.json. Platný je zámok
+    najvyššej generácie; worker mu počas behu obnovuje mtime (heartbeat).
+    Zámok bez obnovy dlhšie ako stale_s sa prevezme vytvorením ďalšej
+    generácie – opäť cez O_EXCL, takže ho prevezme iba jeden worker a cesta
+    platného zámku nikdy nezmizne. Staré generácie sa nemažú.
+    """
+
+    def __init__(self, root, worker_id=None, stale_s=3600.0):
+        self.root = root
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.stale_s = stale_s
+        self.manifest = _read_json(os.path.join(root, MANIFEST))
+        self._held = {}     # id shardu -> cesta k nášmu zámku
+
+    def claim(self):
+        """Vráti ďalší voľný shard (v poradí manifestu) alebo None."""
+        for shard in self.manifest['shards']:
+            if self.is_done(shard['id']):
+                continue
+            if self._try_lock(shard['id']):
+                if self.is_done(shard['id']):
+                    continue   # medzitým dokončený iným workerom
+                return shard
+        return None
+
+    def complete(self, shard_id, info):
+        _write_atomic(self._done_path(shard_id), _dump_json(info))
+
+    def is_done(self, shard_id):
+        return os.path.exists(self._done_path(shard_id))
+
+    def heartbeat(self, shard_id):
+        """Kontext, ktorý počas behu shardu obnovuje mtime jeho zámku."""
+        return _Heartbeat(self._held[shard_id], self.stale_s / 4.0)
+
+    def _try_lock(self, shard_id):
+        gen = 0
+        while True:
+            lock = self._lock_path(shard_id, gen)
+            try:
+                fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if os.path.exists(self._lock_path(shard_id, gen + 1)):
+                    gen += 1        # platný je až novší zámok
+                    continue
+                if not self._is_stale(lock):
+                    return False
+                gen += 1            # prevzatie: O_EXCL na ďalšiu generáciu
+                continue
+            with os.fdopen(fd, 'w') as f:
+                f.write(_dump_json({
+                    'worker': self.worker_id,
+                    'claimed_at': time.time(),
+                    'generation': gen,
+                }))
+            self._held[shard_id] = lock
+            return True
+
+    def _is_stale(self, lock):
+        try:
+            return time.time() - os.path.getmtime(lock) >= self.stale_s
+        except FileNotFoundError:
+            return False    # generácie sa nemažú – sem sa dostane iba pri ručnom zásahu
+
+    def _lock_path(self, shard_id, gen):
+        return os.path.join(self.root, 'claims', f"{shard_id}.{gen}.lock")
+
+    def _done_path(self, shard_id):
+        return os.path.join(self.root, 'done', f"{shard_id}.json")
+
+
+# --------- WORKER ---------
+
+def run_shard(root, shard, algos):
+    """Zabalí jeden shard všetkými algoritmami; výstupy zapíše do parts/<id>/."""
+    part_dir = os.path.join(root, 'parts', shard['id'])
+    os.makedirs(part_dir, exist_ok=True)
+
+    ds_h = DatasetHandler(shard['input'])
+    ds_h.load(shard['start'], shard['end'])
+    blocks = ds_h.prepare_data()
+
+    stats = {}
+    for algo in algos:
+        metrics = SheetMetrics()
+        packer = make_packer(algo, metrics=metrics)
+        rows = []
+        for block in blocks:
+            if block:
+                rows.extend(packer.pack_block(block))
+
+        lines = []
+        writer = csv.writer(_LineBuffer(lines))
+        writer.writerows(rows)
+        _write_atomic(os.path.join(part_dir, f"{algo}.csv"), "".join(lines))
+        stats[algo] = metrics.to_dict()
+
+    _write_atomic(os.path.join(part_dir, 'stats.json'), _dump_json(stats))
+    return {'blocks': len(blocks), 'rows': sum(len(b) for b in blocks)}
+
+
+class _Heartbeat:
+    """Počas behu shardu obnovuje mtime zámku, aby ho iný worker nepovažoval za opustený."""
+
+    def __init__(self, lock, interval):
+        self.lock = lock
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name='shard-heartbeat', daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _beat(self):
+        while not self._stop.wait(self.interval):
+            os.utime(self.lock)
+
+
+class _LineBuffer:
+    """Minimálny 'súbor' pre csv.writer, ktorý zbiera riadky do zoznamu."""
+
+    def __init__(self, lines):
+        self.lines = lines
+
+    def write(self, text):
+        self.lines.append(text)
+
+
+def work(root, worker_id=None, stale_s=3600.0):
+    queue = ShardQueue(root, worker_id, stale_s)
+    algos = queue.manifest['algos']
+    done = 0
+    while True:
+        shard = queue.claim()
+        if shard is None:
+            break
+        start = time.perf_counter()
+        with queue.heartbeat(shard['id']):
+            info = run_shard(root, shard, algos)
+        info.update({'worker': queue.worker_id, 'seconds': time.perf_counter() - start})
+        queue.complete(shard['id'], info)
+        done += 1
+        print(f"[{queue.worker_id}] shard {shard['id']} ({shard['input']} "
+              f"{shard['start']}..{shard['end']}) hotový za {info['seconds']:.2f} s")
+    return done
+
+
+# --------- MERGE ---------
+
+def merge(root, out_dir=None):
+    """
+    Spojí výstupy shardov v poradí manifestu do <out_dir>/<algo>_output.csv
+    a štatistiky do <out_dir>/stats.json. Výsledok nezávisí od toho, ktorý
+    worker ktorý shard spracoval.
+    """
+    manifest = _read_json(os.path.join(root, MANIFEST))
+    out_dir = out_dir or root
+    os.makedirs(out_dir, exist_ok=True)
+
+    missing = [s['id'] for s in manifest['shards']
+               if not os.path.exists(os.path.join(root, 'done', f"{s['id']}.json"))]
+    if missing:
+        raise RuntimeError(f"Nedokončené shardy: {', '.join(missing)}")
+
+    totals = {}
+    for algo in manifest['algos']:
+        totals[algo] = SheetMetrics()
+        parts = []
+        for shard in manifest['shards']:
+            with open(os.path.join(root, 'parts', shard['id'], f"{algo}.csv"), newline='') as f:
+                parts.append(f.read())
+        _write_atomic(os.path.join(out_dir, f"{algo}_output.csv"), "".join(parts))
+
+    for shard in manifest['shards']:
+        stats = _read_json(os.path.join(root, 'parts', shard['id'], 'stats.json'))
+        for algo in manifest['algos']:
+            totals[algo].merge(SheetMetrics.from_dict(stats[algo]))
+
+    _write_atomic(
+        os.path.join(out_dir, 'stats.json'),
+        _dump_json({algo: m.to_dict() for algo, m in totals.items()}),
+    )
+    return totals
+
+
+# --------- LOKALNY BEH ---------
+
+def run_local(root, workers, stale_s=3600.0):
+    """Spustí workers nezávislých procesov nad tou istou frontou a počká na ne."""
+    procs = [
+        subprocess.Popen([
+            sys.executable, os.path.abspath(__file__), 'work',
+            '--dir', root, '--worker-id', f"local-{i}", '--stale-s', str(stale_s),
+        ])
+        for i in range(workers)
+    ]
+    codes = [p.wait() for p in procs]
+    if any(codes):
+        raise RuntimeError(f"Niektorý worker zlyhal (návratové kódy {codes})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shardovaný beh packingu: plan -> work (N procesov/hostov) -> merge.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_plan = sub.add_parser('plan', help="rozdelí vstupy na shardy a zapíše manifest")
+    p_plan.add_argument('--inputs', nargs='+', default=['./data/dataset.csv', './data/dataset_2.csv'])
+    p_plan.add_argument('--dir', default='./output/shards')
+    p_plan.add_argument('--days-per-shard', type=int, default=1)
+    p_plan.add_argument('--algo', choices=list(ENGINES), nargs='+', default=list(ENGINES))
+    p_plan.add_argument('--force', action='store_true', help="prepíše existujúci manifest")
+
+    p_work = sub.add_parser('work', help="spracúva shardy, kým nejaké zostávajú")
+    p_work.add_argument('--dir', default='./output/shards')
+    p_work.add_argument('--worker-id')
+    p_work.add_argument('--stale-s', type=float, default=3600.0)
+
+    p_merge = sub.add_parser('merge', help="spojí výstupy shardov")
+    p_merge.add_argument('--dir', default='./output/shards')
+    p_merge.add_argument('--out')
+
+    p_local = sub.add_parser('run-local', help="work v N lokálnych procesoch a potom merge")
+    p_local.add_argument('--dir', default='./output/shards')
+    p_local.add_argument('--workers', type=int, default=2)
+    p_local.add_argument('--out')
+    p_local.add_argument('--stale-s', type=float, default=3600.0)
+
+    args = parser.parse_args()
+
+    if args.command == 'plan':
+        manifest = plan(args.inputs, args.dir, args.days_per_shard, args.algo, args.force)
+        print(f"Manifest: {len(manifest['shards'])} shardov -> {os.path.join(args.dir, MANIFEST)}")
+    elif args.command == 'work':
+        done = work(args.dir, args.worker_id, args.stale_s)
+        print(f"Spracovaných shardov: {done}")
+    else:
+        if args.command == 'run-local':
+            run_local(args.dir, args.workers, args.stale_s)
+        totals = merge(args.dir, args.out)
+        for algo, metrics in totals.items():
+            print(f"\n--- {algo.upper()} ---")
+            print(metrics.report())
+
+
+if __name__ == "__main__":
+    main()
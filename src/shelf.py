@@ -1,32 +1,36 @@
 import csv
+from bisect import bisect_left, insort
+from math import inf
+from metrics import SheetMetrics
 
 class Shelf:
     MAX_WIDTH = 500.0
     MAX_HEIGHT = 500.0
     MAX_WEIGHT = 200.0
+    OUTPUT_PATH = './output/shelf_output.csv'
 
-    def __init__(self):
+    def __init__(self, metrics=None):
         self._shelf_x = 0.0                # x-os shelfu
         self._shelf_y = 0.0                # y-os shelfu
         self._shelf_height = 0.0           # vyska shelfu
         self._current_weight = 0.0         # vaha plechu
+        self._current_area = 0.0           # plocha komponentov na plechu
         self._sheet_no = 0                 # cislo plechu
 
-        self.komponent_res = []            # vysledok za pol dna
+        self.komponent_res = []            # vysledok celeho behu (iba run_shelf)
 
-        # priemery
-        self.sheet_avg_weight = 0.0        # priemerná váha na plech
-        self.sheet_avg_weight_pct = 0.0    # priemerné % využitie váhy plechu
-        self.sheet_avg_area = 0.0          # priemerná zabrata plocha plechu
-        self.sheet_avg_area_pct = 0.0      # priemerné % využitie plochy plechu
+        # priebezne statistiky plechov (za cely beh)
+        self.metrics = metrics if metrics is not None else SheetMetrics(
+            self.MAX_WEIGHT, self.MAX_WIDTH * self.MAX_HEIGHT
+        )
 
     # --------- GETTERY ----------
 
     def get_sheet_avg_weight(self):
-        return self.sheet_avg_weight, self.sheet_avg_weight_pct
+        return self.metrics.get_sheet_avg_weight()
     
     def get_sheet_avg_area(self):
-        return self.sheet_avg_area, self.sheet_avg_area_pct
+        return self.metrics.get_sheet_avg_area()
 
     # --------- FUNKCIE ----------
 
@@ -35,21 +39,25 @@ class Shelf:
         self.komponent_res.clear()
 
         for komponents in dataset:
-            self._sheet_no = 0
-            self._make_shelf(komponents)
+            self.komponent_res.extend(self.pack_block(komponents))
 
         self._write_csv()
-        
+
+    # --------- JEDEN BLOK ---------
+    def pack_block(self, komponents):
+        """Zabalí jeden half-day blok a vráti jeho riadky výstupu."""
+        self._sheet_no = 0
+        return self._make_shelf(komponents)
     
     def _make_shelf(self, komponents):
-        used_weight = 0.0   # súčet váh všetkých plechov
-        used_area = 0.0     # súčet plôch všetkých komponentov
+        rows = []           # výsledok za pol dna
 
         # reset pozície a váhy pre pol dna
         self._shelf_x = 0.0
         self._shelf_y = 0.0
         self._shelf_height = 0.0
         self._current_weight = 0.0
+        self._current_area = 0.0
 
         for komponent in komponents:
             k_x = komponent[1][0]  # šírka
@@ -59,8 +67,7 @@ class Shelf:
 
             # 1) kontrola hmotnosti
             if self._current_weight + k_w > self.MAX_WEIGHT:
-                used_weight += self._current_weight   # pripočítaj váhu starého plechu
-                self._new_sheet()                     # začni nový plech
+                self._new_sheet()                     # zavri plech a začni nový
 
             # 2) kontrola šírky
             if self._shelf_x + k_x > self.MAX_WIDTH:
@@ -70,55 +77,177 @@ class Shelf:
 
             # 3) kontrola výšky – nevojde na výšku → nový plech
             if self._shelf_y + k_y > self.MAX_HEIGHT:
-                used_weight += self._current_weight   # zavri plech
-                self._new_sheet()                     # nový plech
+                self._new_sheet()                     # zavri plech a začni nový
 
             # výška police
             if self._shelf_height < k_y:
                 self._shelf_height = k_y
 
-            # prirátanie váhy
+            # prirátanie váhy a plochy
             self._current_weight += k_w
-
-            # prirátanie plochy (globálne – nezáleží na tom, na ktorom plechu)
-            used_area += k_s
+            self._current_area += k_s
 
             # posun v osi x
             self._shelf_x += k_x
 
             # uloženie výsledku
-            self.komponent_res.append(
+            rows.append(
                 [self._sheet_no, komponent[0], komponent[3], komponent[4], self._shelf_x, self._shelf_y]
             )
 
         if self._current_weight > 0:
-            used_weight += self._current_weight
+            self._close_sheet()
             total_sheets = self._sheet_no + 1 
         else:
             total_sheets = self._sheet_no
 
-        self._set_stats(total_sheets, used_weight, used_area)
+        self.metrics.end_block(total_sheets)
+        return rows
 
     # --------- NOVY PLECH ---------
     def _new_sheet(self):
+        self._close_sheet()
         self._sheet_no += 1
         self._shelf_x = 0.0
         self._shelf_y = 0.0
         self._shelf_height = 0.0
         self._current_weight = 0.0
+        self._current_area = 0.0
 
-    # --------- ULOZENIE STATOV ---------
-    def _set_stats(self, total_sheets, used_weight, used_area):
-        self.sheet_avg_weight = used_weight / total_sheets
-        self.sheet_avg_weight_pct = (self.sheet_avg_weight / self.MAX_WEIGHT) * 100.0
-        avg_area_per_sheet = used_area / total_sheets
-        self.sheet_avg_area = avg_area_per_sheet
-        max_area_per_sheet = self.MAX_WIDTH * self.MAX_HEIGHT
-        self.sheet_avg_area_pct = (avg_area_per_sheet / max_area_per_sheet) * 100.0
+    # --------- UZAVRETIE PLECHU ---------
+    def _close_sheet(self):
+        if self._current_area > 0:
+            self.metrics.add_sheet(self._current_weight, self._current_area)
 
     # --------- ZAPISANIE DO CSV ---------
     def _write_csv(self):
-        with open('./output/shelf_output.csv', 'w', newline='') as csvfile:
+        with open(self.OUTPUT_PATH, 'w', newline='') as csvfile:
             writer = csv.writer(csvfile, delimiter=',')
             for item in self.komponent_res:
                 writer.writerow(item)
+
+
+class MultiShelf(Shelf):
+    """
+    Shelf s viacerými otvorenými policami naraz.
+
+    Všetky police na otvorených plechoch sú v zoradenom indexe podľa
+    (výška, voľná šírka). Komponent ide na najnižšiu policu, do ktorej sa
+    zmestí na výšku, a v rámci nej na tú s najmenšou voľnou šírkou, ktorá
+    ešte stačí (bisect). Novú policu otvorí až keď žiadna nevyhovuje.
+    Najviac max_open_sheets plechov je otvorených; najstarší sa zatvorí.
+
+    Index nepozná váhovú rezervu plechu: hľadanie prejde všetky výšky
+    >= výška komponentu a police na plechoch bez rezervy preskakuje
+    lineárne, teda O(počet výšok + počet políc v indexe). Lacné je to len
+    preto, že v indexe sú iba police max_open_sheets otvorených plechov –
+    tento strop ohraničuje cenu hľadania, nie bisect.
+    Výstup: [plech, sn, dátum, čas, x, y] – ľavý horný roh komponentu.
+    """
+
+    OUTPUT_PATH = './output/multishelf_output.csv'
+
+    def __init__(self, metrics=None, max_open_sheets=4):
+        super().__init__(metrics)
+        self.max_open_sheets = max_open_sheets
+        self._reset_block()
+
+    def _reset_block(self):
+        self._sheets = []        # [váha, plocha, y ďalšej police] pre každý plech bloku
+        self._sheet_shelves = [] # id políc na každom plechu
+        self._open = []          # čísla otvorených plechov (od najstaršieho)
+        self._shelves = []       # [plech, y, výška, obsadená šírka]
+        self._index = []         # zoradené kľúče (výška, voľná šírka, id police)
+
+    def _make_shelf(self, komponents):
+        self._reset_block()
+        rows = []
+
+        for komponent in komponents:
+            k_x = komponent[1][0]  # šírka
+            k_y = komponent[1][1]  # výška
+            k_w = komponent[2]     # váha
+
+            shelf_id = self._find_shelf(k_x, k_y, k_w)
+            if shelf_id is None:
+                shelf_id = self._open_shelf(k_y, k_w)
+
+            sheet_no, y, height, x = self._shelves[shelf_id]
+
+            # posun police v osi x (kľúč v indexe sa mení)
+            self._index.pop(bisect_left(self._index, self._key(shelf_id)))
+            self._shelves[shelf_id][3] = x + k_x
+            insort(self._index, self._key(shelf_id))
+
+            sheet = self._sheets[sheet_no]
+            sheet[0] += k_w
+            sheet[1] += k_x * k_y
+
+            rows.append(
+                [sheet_no, komponent[0], komponent[3], komponent[4], x, y]
+            )
+
+        while self._open:
+            self._close_open_sheet()
+
+        self.metrics.end_block(len(self._sheets))
+        return rows
+
+    # --------- HLADANIE POLICE ---------
+    def _key(self, shelf_id):
+        sheet_no, y, height, x = self._shelves[shelf_id]
+        return (height, self.MAX_WIDTH - x, shelf_id)
+
+    def _find_shelf(self, k_x, k_y, k_w):
+        index = self._index
+        n = len(index)
+
+        # prvá polica s výškou >= k_y
+        i = bisect_left(index, (k_y,))
+        while i < n:
+            height = index[i][0]
+            # v rámci výšky prvá polica s voľnou šírkou >= k_x
+            j = bisect_left(index, (height, k_x), i)
+            while j < n and index[j][0] == height:
+                shelf_id = index[j][2]
+                sheet_no = self._shelves[shelf_id][0]
+                if self._sheets[sheet_no][0] + k_w <= self.MAX_WEIGHT:
+                    return shelf_id
+                j += 1
+            # ďalšia výška
+            i = bisect_left(index, (height, inf), j)
+        return None
+
+    # --------- NOVA POLICA ---------
+    def _open_shelf(self, k_y, k_w):
+        for sheet_no in self._open:
+            sheet = self._sheets[sheet_no]
+            if sheet[2] + k_y <= self.MAX_HEIGHT and sheet[0] + k_w <= self.MAX_WEIGHT:
+                return self._add_shelf(sheet_no, k_y)
+
+        # žiadny otvorený plech nestačí → nový plech
+        if len(self._open) >= self.max_open_sheets:
+            self._close_open_sheet()
+
+        self._sheets.append([0.0, 0.0, 0.0])
+        self._sheet_shelves.append([])
+        self._open.append(len(self._sheets) - 1)
+        return self._add_shelf(len(self._sheets) - 1, k_y)
+
+    def _add_shelf(self, sheet_no, height):
+        sheet = self._sheets[sheet_no]
+        shelf_id = len(self._shelves)
+        self._shelves.append([sheet_no, sheet[2], height, 0.0])
+        sheet[2] += height
+        self._sheet_shelves[sheet_no].append(shelf_id)
+        insort(self._index, self._key(shelf_id))
+        return shelf_id
+
+    # --------- ZATVORENIE PLECHU ---------
+    def _close_open_sheet(self):
+        sheet_no = self._open.pop(0)
+        for shelf_id in self._sheet_shelves[sheet_no]:
+            self._index.pop(bisect_left(self._index, self._key(shelf_id)))
+        weight, area, _ = self._sheets[sheet_no]
+        if area > 0:
+            self.metrics.add_sheet(weight, area)